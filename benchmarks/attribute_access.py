@@ -0,0 +1,66 @@
+"""
+Compares attribute access on wrappers which forward through
+``__getattr__`` against the generated forwarding properties.
+
+Run with ``python -m benchmarks.attribute_access``
+"""
+
+import timeit
+from types import SimpleNamespace
+
+try:
+    import nextcord
+except ModuleNotFoundError:
+    import disnake as nextcord
+
+from bot_base.wraps import Meta, WrappedChannel, WrappedMember, WrappedUser
+from bot_base.wraps.channel import abc
+
+ITERATIONS = 1_000_000
+
+
+class LegacyMember(Meta, nextcord.Member):
+    # How wrappers forwarded attributes before they were generated
+    def __getattr__(self, item):
+        return getattr(self._wrapped_item, item)
+
+
+class LegacyUser(Meta, nextcord.User):
+    def __getattr__(self, item):
+        return getattr(self._wrapped_item, item)
+
+
+class LegacyChannel(Meta, abc.GuildChannel, abc.PrivateChannel):
+    def __getattr__(self, item):
+        return getattr(self._wrapped_item, item)
+
+
+def bench(wrapper, attribute: str) -> float:
+    """Returns the average access time in nanoseconds"""
+    timer = timeit.Timer(f"wrapper.{attribute}", globals={"wrapper": wrapper})
+    return min(timer.repeat(repeat=5, number=ITERATIONS)) / ITERATIONS * 1e9
+
+
+def main():
+    item = SimpleNamespace(
+        id=1, guild=SimpleNamespace(id=2), name="name", topic="topic"
+    )
+    cases = [
+        ("Member", LegacyMember, WrappedMember, ("id", "guild", "name")),
+        ("User", LegacyUser, WrappedUser, ("id", "name")),
+        # topic isn't known to the abc, so it still uses __getattr__
+        ("Channel", LegacyChannel, WrappedChannel, ("id", "guild", "topic")),
+    ]
+    print(f"{'attribute':<16} {'before':>10} {'after':>10}")
+    for name, legacy, wrapped, attributes in cases:
+        before, after = legacy(item, None), wrapped(item, None)
+        for attribute in attributes:
+            print(
+                f"{name + '.' + attribute:<16} "
+                f"{bench(before, attribute):>8.1f}ns "
+                f"{bench(after, attribute):>8.1f}ns"
+            )
+
+
+if __name__ == "__main__":
+    main()
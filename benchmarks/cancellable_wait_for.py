@@ -0,0 +1,67 @@
+"""
+Times starting, cancelling and resolving 10k concurrent
+CancellableWaitFor instances, as live prompts and paginators do.
+
+Run with ``python -m benchmarks.cancellable_wait_for``
+"""
+
+import asyncio
+import time
+import tracemalloc
+
+from bot_base import BotBase, EventCancelled
+
+WAITERS = 10_000
+
+
+async def start_waiters(bot: BotBase, event: str):
+    waiters = [bot.cancellable_wait_for(event) for _ in range(WAITERS)]
+    tasks = [asyncio.create_task(waiter.wait()) for waiter in waiters]
+    # Let every waiter register itself
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    return waiters, tasks
+
+
+async def main():
+    bot = BotBase(command_prefix="!", leave_db=True)
+
+    start = time.perf_counter()
+    waiters, tasks = await start_waiters(bot, "reaction_add")
+    started = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for waiter in waiters:
+        waiter.cancel()
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    cancelled = time.perf_counter() - start
+    assert all(isinstance(result, EventCancelled) for result in results)
+
+    tracemalloc.start()
+    waiters, tasks = await start_waiters(bot, "reaction_add")
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for waiter in waiters:
+        waiter.cancel()
+
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    waiters, tasks = await start_waiters(bot, "reaction_add")
+    start = time.perf_counter()
+    bot.dispatch("reaction_add", "payload")
+    results = await asyncio.gather(*tasks)
+    resolved = time.perf_counter() - start
+    assert results == ["payload"] * WAITERS
+    # Anything still registered once every waiter is done
+    await asyncio.sleep(0)
+    leftover = sum(len(listeners) for listeners in bot._listeners.values())
+
+    print(f"start   {started * 1000:8.1f}ms, peak {peak / 1024 / 1024:.1f}MiB")
+    print(f"cancel  {cancelled * 1000:8.1f}ms")
+    print(f"resolve {resolved * 1000:8.1f}ms")
+    print(f"{leftover} listeners left behind")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Compares how many wrapper objects are allocated per message
+when a message is dispatched and then turned into a context.
+
+The lazy proxy counts as a wrapper itself.
+
+Run with ``python -m benchmarks.wrapper_allocations``
+"""
+
+import time
+from collections import deque
+from types import SimpleNamespace
+
+from bot_base import BotBase
+from bot_base.wraps import Meta, WrappedChannel, WrappedUser
+
+MESSAGES = 100_000
+
+constructed = 0
+_original_init = Meta.__init__
+
+
+def _counting_init(self, *args, **kwargs):
+    global constructed
+    constructed += 1
+    _original_init(self, *args, **kwargs)
+
+
+def legacy_wrap(bot: BotBase, message):
+    # What get_wrapped_message did before wrappers were reused
+    message.channel = WrappedChannel(message.channel, bot)
+    message.author = WrappedUser(message.author, bot)
+    return message
+
+
+def run(name: str, wrap) -> None:
+    global constructed
+    constructed = 0
+
+    # Channels are long lived objects within the library cache,
+    # whereas authors are often a new object per message. Like the
+    # library we also keep the last 1000 messages around.
+    channel = SimpleNamespace(id=1)
+    message_cache = deque(maxlen=1000)
+    start = time.perf_counter()
+    for i in range(MESSAGES):
+        message = SimpleNamespace(channel=channel, author=SimpleNamespace(id=i))
+        # Once for dispatch and once for BotContext
+        message_cache.append(wrap(wrap(message)))
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<8} {constructed / MESSAGES:.2f} wrappers/message, "
+        f"{elapsed / MESSAGES * 1_000_000:.2f}µs/message"
+    )
+
+
+def main():
+    bot = BotBase(command_prefix="!", leave_db=True)
+    Meta.__init__ = _counting_init
+    try:
+        run("before", lambda m: legacy_wrap(bot, m))
+        run("after", bot.get_wrapped_message)
+        # Nothing reads channel or author, so only the proxy is built
+        run("lazy", bot.get_lazy_wrapped_message)
+    finally:
+        Meta.__init__ = _original_init
+
+
+if __name__ == "__main__":
+    main()
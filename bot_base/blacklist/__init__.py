@@ -1,3 +1,4 @@
 from .blacklist import BlacklistManager
+from .id_set import CompactIdSet
 
-__all__ = ("BlacklistManager",)
+__all__ = ("BlacklistManager", "CompactIdSet")
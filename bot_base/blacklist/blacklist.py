@@ -1,12 +1,77 @@
+import asyncio
+import datetime
+import heapq
+import logging
+from array import array
+from typing import Optional, Set, Dict, Any, Union, List, Tuple, Iterable
+
+from alaric import Document
+from pymongo import UpdateOne
+
+from bot_base.blacklist.id_set import CompactIdSet
 from bot_base.db import MongoManager
 
+log = logging.getLogger(__name__)
+
 
 class BlacklistManager:
-    def __init__(self, db: MongoManager):
+    # How far back to re-check on each sync to
+    # cover clock skew between processes
+    SYNC_OVERLAP = datetime.timedelta(seconds=30)
+
+    def __init__(
+        self,
+        db: MongoManager,
+        *,
+        sync_interval: Optional[float] = None,
+        tombstone_retention: datetime.timedelta = datetime.timedelta(days=7),
+        compact: bool = False,
+        batch_size: int = 10_000,
+    ):
+        """
+        Parameters
+        ----------
+        db: MongoManager
+            The database to persist blacklists within
+        sync_interval: Optional[float]
+            If set, pull changes made by other
+            processes every sync_interval seconds.
+        tombstone_retention: datetime.timedelta
+            How long removed entries are remembered in the
+            database so other processes can sync the removal.
+
+            Defaults to 7 days
+        compact: bool
+            Store blacklisted ids in a :class:`CompactIdSet`
+            rather then a ``set``, trading slower changes
+            for far less memory on very large blacklists.
+
+            Defaults to ``False``
+        batch_size: int
+            How many ids to fetch per round trip
+            when loading the blacklist.
+
+            Defaults to 10,000
+        """
         self.db = db
+        self.compact: bool = compact
+        self.batch_size: int = batch_size
 
-        self.users = set()
-        self.guilds = set()
+        self.users: Union[Set[int], CompactIdSet] = self._new_id_set()
+        self.guilds: Union[Set[int], CompactIdSet] = self._new_id_set()
+
+        self.sync_interval: Optional[float] = sync_interval
+        self.tombstone_retention: datetime.timedelta = tombstone_retention
+
+        self._last_synced: Optional[datetime.datetime] = None
+        self._sync_task: Optional[asyncio.Task] = None
+
+        # Temporary entries, the heap holds (timestamp, is_guild_blacklist, id)
+        # while _expiries holds the current expiry per entry so heap items
+        # for entries which were since removed or re-added can be skipped
+        self._expiry_heap: List[Tuple[float, bool, int]] = []
+        self._expiries: Dict[Tuple[bool, int], float] = {}
+        self._expiry_timer: Optional[asyncio.TimerHandle] = None
 
     def __contains__(self, item: int) -> bool:
         """
@@ -24,31 +89,237 @@ class BlacklistManager:
         """
         Called sometime on creation in order to
         populate the internal blacklist.
+
+        Calling this again only pulls changes
+        made since the last time it was called.
+        """
+        if (
+            self._last_synced is not None
+            and self._now() - self._last_synced < self.tombstone_retention
+        ):
+            await self.sync()
+            return
+
+        synced_at = self._now()
+        (guilds, expiring_guilds), (users, expiring_users) = await asyncio.gather(
+            self._load_ids(self.db.guild_blacklist),
+            self._load_ids(self.db.user_blacklist),
+        )
+
+        self.guilds = guilds
+        self.users = users
+        self._last_synced = synced_at - self.SYNC_OVERLAP
+
+        self._expiry_heap.clear()
+        self._expiries.clear()
+        for expiring, is_guild_blacklist in (
+            (expiring_guilds, True),
+            (expiring_users, False),
+        ):
+            for item, expires_at in expiring:
+                self._schedule_expiry(item, is_guild_blacklist, expires_at)
+
+        for document in (self.db.guild_blacklist, self.db.user_blacklist):
+            await document.raw_collection.create_index(
+                "removed_at",
+                expireAfterSeconds=int(self.tombstone_retention.total_seconds()),
+            )
+            # Lets Mongo delete temporary entries once they expire
+            await document.raw_collection.create_index(
+                "expires_at", expireAfterSeconds=0
+            )
+            # Keeps each incremental sync from scanning the collection
+            await document.raw_collection.create_index("updated_at")
+
+        if self.sync_interval is not None and self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def sync(self) -> None:
+        """
+        Pull in any blacklist changes made
+        by other processes since the last sync.
+        """
+        if self._expiry_timer is None:
+            self._reschedule_expiry_timer()
+
+        synced_at = self._now()
+        for document, is_guild_blacklist in (
+            (self.db.guild_blacklist, True),
+            (self.db.user_blacklist, False),
+        ):
+            cursor = document.raw_collection.find(
+                {"updated_at": {"$gte": self._last_synced}},
+                {"_id": 1, "removed_at": 1, "expires_at": 1},
+            )
+            async for entry in cursor:
+                self.apply_change(
+                    entry["_id"],
+                    is_guild_blacklist=is_guild_blacklist,
+                    removed="removed_at" in entry,
+                    expires_at=entry.get("expires_at"),
+                )
+
+        self._last_synced = synced_at - self.SYNC_OVERLAP
+
+    def apply_change(
+        self,
+        item: int,
+        *,
+        is_guild_blacklist: bool,
+        removed: bool,
+        expires_at: Optional[datetime.datetime] = None,
+    ) -> None:
+        """
+        Update the internal blacklist without touching the database.
+
+        Use this to push changes from another
+        process, for example over a message queue.
+
+        Parameters
+        ----------
+        item: int
+            The id which changed
+        is_guild_blacklist: bool
+            Whether item is a guild or a user
+        removed: bool
+            ``True`` if item is no longer blacklisted
+        expires_at: Optional[datetime.datetime]
+            When item should stop being blacklisted,
+            ``None`` meaning never.
+
+        Notes
+        -----
+        This may be called before the event loop is running, any
+        expiry is then scheduled by the next call to :meth:`initialize`,
+        :meth:`sync` or this method made from within the event loop.
+        """
+        ids = self.guilds if is_guild_blacklist else self.users
+        self._expiries.pop((is_guild_blacklist, item), None)
+
+        if removed or (
+            expires_at is not None and self._as_utc(expires_at) <= self._now()
+        ):
+            ids.discard(item)
+            return
+
+        ids.add(item)
+        if expires_at is not None:
+            self._schedule_expiry(item, is_guild_blacklist, expires_at)
+
+    async def watch_changes(self) -> None:
+        """
+        Apply changes from other processes as they happen
+        rather then waiting for the next sync.
+
+        Notes
+        -----
+        This uses change streams and as
+        such requires a replica set.
         """
-        all_guild_entries = await self.db.guild_blacklist.get_all()
-        for guild in all_guild_entries:
-            self.guilds.add(guild["_id"])
 
-        all_user_entries = await self.db.user_blacklist.get_all()
-        for user in all_user_entries:
-            self.users.add(user["_id"])
+        async def watch(document: Document, is_guild_blacklist: bool):
+            async with document.raw_collection.watch(
+                full_document="updateLookup"
+            ) as stream:
+                async for change in stream:
+                    full_document: Optional[Dict[str, Any]] = change.get("fullDocument")
+                    self.apply_change(
+                        change["documentKey"]["_id"],
+                        is_guild_blacklist=is_guild_blacklist,
+                        removed=full_document is None or "removed_at" in full_document,
+                        expires_at=(full_document or {}).get("expires_at"),
+                    )
+
+        await asyncio.gather(
+            watch(self.db.guild_blacklist, True),
+            watch(self.db.user_blacklist, False),
+        )
 
     async def add_to_blacklist(
-        self, item: int, reason: str = "Unknown", is_guild_blacklist: bool = True
+        self,
+        item: int,
+        reason: str = "Unknown",
+        is_guild_blacklist: bool = True,
+        *,
+        expires_at: Optional[datetime.datetime] = None,
     ) -> None:
         """
         Add a given int to the internal blacklist
         as well as persist it within the db
+
+        Pass expires_at to only blacklist item until the
+        given time, naive datetimes are treated as UTC.
         """
         assert isinstance(item, int)
 
-        if is_guild_blacklist:
-            self.guilds.add(item)
-            await self.db.guild_blacklist.upsert({"_id": item, "reason": reason})
+        document = (
+            self.db.guild_blacklist if is_guild_blacklist else self.db.user_blacklist
+        )
+        self.apply_change(
+            item,
+            is_guild_blacklist=is_guild_blacklist,
+            removed=False,
+            expires_at=expires_at,
+        )
 
+        update: Dict[str, Any] = {
+            "$set": {"reason": reason, "updated_at": self._now()},
+            "$unset": {"removed_at": True},
+        }
+        if expires_at is not None:
+            update["$set"]["expires_at"] = expires_at
         else:
-            self.users.add(item)
-            await self.db.user_blacklist.upsert({"_id": item, "reason": reason})
+            update["$unset"]["expires_at"] = True
+
+        await document.raw_collection.update_one({"_id": item}, update, upsert=True)
+
+    async def bulk_add_to_blacklist(
+        self,
+        items: Iterable[int],
+        reason: str = "Unknown",
+        is_guild_blacklist: bool = True,
+    ) -> int:
+        """
+        Permanently blacklist many ids at once
+        using a single write to the database.
+
+        Ids which were already blacklisted are still
+        written, making any temporary entries permanent.
+
+        Returns
+        -------
+        int
+            How many ids were not already blacklisted
+        """
+        items = set(items)
+        if not items:
+            return 0
+
+        document = (
+            self.db.guild_blacklist if is_guild_blacklist else self.db.user_blacklist
+        )
+        ids = self.guilds if is_guild_blacklist else self.users
+        added = sum(1 for item in items if item not in ids)
+        ids.update(items)
+        for item in items:
+            self._expiries.pop((is_guild_blacklist, item), None)
+
+        now = self._now()
+        await document.raw_collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": item},
+                    {
+                        "$set": {"reason": reason, "updated_at": now},
+                        "$unset": {"removed_at": True, "expires_at": True},
+                    },
+                    upsert=True,
+                )
+                for item in items
+            ],
+            ordered=False,
+        )
+        return added
 
     async def remove_from_blacklist(
         self, item: int, is_guild_blacklist: bool = True
@@ -59,10 +330,135 @@ class BlacklistManager:
         """
         assert isinstance(item, int)
 
-        if is_guild_blacklist:
-            self.guilds.discard(item)
-            await self.db.guild_blacklist.delete({"_id": item})
+        document = (
+            self.db.guild_blacklist if is_guild_blacklist else self.db.user_blacklist
+        )
+        self.apply_change(item, is_guild_blacklist=is_guild_blacklist, removed=True)
+
+        # Kept as a tombstone so other processes see the removal on
+        # their next sync, the TTL index deletes it afterwards
+        now = self._now()
+        await document.raw_collection.update_one(
+            {"_id": item, "removed_at": {"$exists": False}},
+            {"$set": {"updated_at": now, "removed_at": now}},
+        )
+
+    async def close(self) -> None:
+        """Stop syncing with the database and expiring entries."""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            self._sync_task = None
+
+        if self._expiry_timer is not None:
+            self._expiry_timer.cancel()
+            self._expiry_timer = None
 
+    def _new_id_set(self) -> Union[Set[int], CompactIdSet]:
+        return CompactIdSet() if self.compact else set()
+
+    async def _load_ids(
+        self, document: Document
+    ) -> Tuple[Union[Set[int], CompactIdSet], List[Tuple[int, datetime.datetime]]]:
+        cursor = document.raw_collection.find(
+            {"removed_at": {"$exists": False}},
+            {"_id": 1, "expires_at": 1},
+            batch_size=self.batch_size,
+        )
+        now = self._now()
+        expiring: List[Tuple[int, datetime.datetime]] = []
+
+        if self.compact:
+            # Sorted by the _id index so ids can be appended
+            # straight into the array without a temporary list
+            ids = array("Q")
+            cursor = cursor.sort("_id", 1)
         else:
-            self.users.discard(item)
-            await self.db.user_blacklist.delete({"_id": item})
+            ids = set()
+
+        async for entry in cursor:
+            expires_at: Optional[datetime.datetime] = entry.get("expires_at")
+            if expires_at is not None:
+                # Expired but Mongo hasn't deleted it yet
+                if self._as_utc(expires_at) <= now:
+                    continue
+
+                expiring.append((entry["_id"], expires_at))
+
+            if self.compact:
+                ids.append(entry["_id"])
+            else:
+                ids.add(entry["_id"])
+
+        if self.compact:
+            return CompactIdSet.from_sorted(ids), expiring
+
+        return ids, expiring
+
+    def _schedule_expiry(
+        self, item: int, is_guild_blacklist: bool, expires_at: datetime.datetime
+    ) -> None:
+        timestamp = self._as_utc(expires_at).timestamp()
+        self._expiries[(is_guild_blacklist, item)] = timestamp
+        heapq.heappush(self._expiry_heap, (timestamp, is_guild_blacklist, item))
+
+        if self._expiry_timer is None or self._expiry_heap[0][0] == timestamp:
+            # This is now the next entry due to expire,
+            # or the timer was never started
+            self._reschedule_expiry_timer()
+
+    def _reschedule_expiry_timer(self) -> None:
+        if self._expiry_timer is not None:
+            self._expiry_timer.cancel()
+            self._expiry_timer = None
+
+        if not self._expiry_heap:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not within the event loop yet, entries stay in the
+            # heap until something schedules the timer from within it
+            return
+
+        delay = self._expiry_heap[0][0] - self._now().timestamp()
+        self._expiry_timer = loop.call_later(max(delay, 0), self._expire_due_entries)
+
+    def _expire_due_entries(self) -> None:
+        self._expiry_timer = None
+        now = self._now().timestamp()
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            timestamp, is_guild_blacklist, item = heapq.heappop(self._expiry_heap)
+            if self._expiries.get((is_guild_blacklist, item)) != timestamp:
+                # Since removed, re-added or given a new expiry
+                continue
+
+            del self._expiries[(is_guild_blacklist, item)]
+            (self.guilds if is_guild_blacklist else self.users).discard(item)
+            log.debug(
+                "Temporary blacklist expired for %s(id=%s)",
+                "Guild" if is_guild_blacklist else "User",
+                item,
+            )
+
+        self._reschedule_expiry_timer()
+
+    @staticmethod
+    def _as_utc(value: datetime.datetime) -> datetime.datetime:
+        # Mongo returns naive datetimes which are in UTC
+        if value.tzinfo is None:
+            return value.replace(tzinfo=datetime.timezone.utc)
+
+        return value
+
+    @staticmethod
+    def _now() -> datetime.datetime:
+        return datetime.datetime.now(tz=datetime.timezone.utc)
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                log.exception("Failed to sync the blacklist")
@@ -0,0 +1,95 @@
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Iterator, Any
+
+
+class CompactIdSet:
+    """
+    A memory efficient set of Discord ids.
+
+    Ids are stored as a sorted array of unsigned 64 bit
+    integers, using 8 bytes per id rather then the 60+
+    bytes a ``set`` of ints costs. Lookups are a binary
+    search, while single adds and removes are O(n) so
+    this suits large and mostly static blacklists.
+    """
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._ids: array = array("Q", sorted(set(ids)))
+
+    def __contains__(self, item: Any) -> bool:
+        if not isinstance(item, int) or item < 0:
+            return False
+
+        index = bisect_left(self._ids, item)
+        return index < len(self._ids) and self._ids[index] == item
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __repr__(self):
+        return f"<CompactIdSet(size={len(self._ids)})>"
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, CompactIdSet):
+            return self._ids == other._ids
+
+        if isinstance(other, (set, frozenset)):
+            return len(self) == len(other) and all(i in self for i in other)
+
+        return NotImplemented
+
+    @classmethod
+    def from_sorted(cls, ids: array) -> "CompactIdSet":
+        """
+        Build a set from an already sorted and
+        de-duplicated array without copying it.
+        """
+        id_set = cls()
+        id_set._ids = ids
+        return id_set
+
+    def add(self, item: int) -> None:
+        index = bisect_left(self._ids, item)
+        if index < len(self._ids) and self._ids[index] == item:
+            return
+
+        self._ids.insert(index, item)
+
+    def discard(self, item: int) -> None:
+        index = bisect_left(self._ids, item)
+        if index < len(self._ids) and self._ids[index] == item:
+            del self._ids[index]
+
+    def update(self, items: Iterable[int]) -> None:
+        """Add many ids at once, cheaper then repeatedly calling add."""
+        new_ids = sorted(set(items))
+        if not new_ids:
+            return
+
+        merged = array("Q")
+        existing = self._ids
+        i = 0
+        for item in new_ids:
+            index = bisect_left(existing, item, i)
+            merged.extend(existing[i:index])
+            i = index
+
+            if i < len(existing) and existing[i] == item:
+                continue
+
+            merged.append(item)
+
+        merged.extend(existing[i:])
+        self._ids = merged
+
+    def difference_update(self, items: Iterable[int]) -> None:
+        """Remove many ids at once."""
+        to_remove = set(items)
+        if to_remove:
+            self._ids = array("Q", (i for i in self._ids if i not in to_remove))
@@ -3,15 +3,26 @@ import datetime
 import functools
 import sys
 import logging
+import time
 import traceback
-from typing import Optional, List, Any, Dict, Union, Callable, Coroutine
+import weakref
+from typing import (
+    Optional,
+    List,
+    Any,
+    Dict,
+    Union,
+    Callable,
+    Coroutine,
+    Type,
+    TypeVar,
+    Tuple,
+)
 
 import humanize
-from alaric import AQ
-from alaric.comparison import EQ
-
 from bot_base import CancellableWaitFor
-from bot_base.caches import TimedCache
+from bot_base.caches import BoundedCache, SingleFlight, TimedCache
+from bot_base.caches.abc import Cache
 
 try:
     import nextcord
@@ -25,10 +36,17 @@ except ModuleNotFoundError:
     from disnake.ext.commands.converter import CONVERTER_MAPPING
 
 from bot_base.blacklist import BlacklistManager
+from bot_base.coalescing import CoalesceMode, EventCoalescer
 from bot_base.context import BotContext
 from bot_base.db import MongoManager
+from bot_base.executors import InstrumentedThreadPool, ProcessOffloader
 from bot_base.exceptions import PrefixNotFound, BlacklistedEntry
+from bot_base.prefixes import PrefixMatcher
+from bot_base.scheduler import CommandScheduler
+from bot_base.stats import CommandStatistics, EventStatistics
 from bot_base.wraps import (
+    LazyWrappedMessage,
+    Meta,
     WrappedChannel,
     WrappedMember,
     WrappedUser,
@@ -36,6 +54,9 @@ from bot_base.wraps import (
 )
 
 log = logging.getLogger(__name__)
+W = TypeVar("W", bound=Meta)
+# Dispatch table sentinel, as None means handled but not wrapped
+_UNHANDLED = object()
 
 
 CONVERTER_MAPPING[nextcord.User] = WrappedUser
@@ -47,8 +68,8 @@ class BotBase(commands.Bot):
     """
     Attributes
     ----------
-    command_prefix: str
-        Your bots command prefix
+    command_prefix: Union[str, List[str]]
+        Your bots command prefix, or prefixes
     leave_db: bool
         If ``True``, don't create a database instance.
 
@@ -57,26 +78,143 @@ class BotBase(commands.Bot):
     mongo_url: Optional[str] = None,
     load_builtin_commands: bool = False,
     mongo_database_name: Optional[str] = None,
+    prefix_cache: Optional[Cache]
+        The cache to store each guilds prefix, or list of
+        prefixes, in, for example a
+        :class:`~bot_base.caches.BoundedCache` to cap memory usage.
+
+        Defaults to an unbounded :class:`~bot_base.caches.TimedCache`
+    prefix_not_found_ttl: Optional[datetime.timedelta]
+        How long to remember that a guild has no custom
+        prefix before checking the database again.
+        Pass ``None`` to disable caching missing prefixes.
+
+        Defaults to 1 hour
+    load_prefix_cache_on_ready: bool
+        If ``True``, bulk load the prefixes for every guild
+        this shard holds into ``prefix_cache`` on the first
+        ``on_ready`` rather then fetching them on first use.
+
+        Defaults to ``False``
+    raise_on_blacklisted: bool
+        If ``True``, messages from blacklisted users or
+        guilds raise :class:`BlacklistedEntry`, otherwise
+        they are silently ignored.
+
+        Defaults to ``True``
+    blacklist_sync_interval: Optional[float]
+        If set, pull blacklist changes made by other
+        processes every blacklist_sync_interval seconds.
+
+        Defaults to ``None``
+    compact_blacklist: bool
+        If ``True``, store blacklisted ids in a
+        :class:`~bot_base.blacklist.CompactIdSet` to save
+        memory on very large blacklists.
+
+        Defaults to ``False``
+    skip_non_command_messages: bool
+        If ``True``, messages which can't start with a
+        known prefix or a mention of the bot are dropped
+        before any command processing happens.
+
+        Disable this if you override how prefixes are resolved.
+
+        Defaults to ``True``
+    lazy_message_wrapping: bool
+        If ``True``, messages are dispatched as a
+        :class:`~bot_base.wraps.LazyWrappedMessage` which only
+        wraps ``channel`` and ``author`` when first accessed,
+        rather than wrapping both eagerly for every message.
+
+        Defaults to ``False``
+    event_stats_sample_rate: Optional[float]
+        If provided, count every dispatched event and time
+        this fraction of listener calls, see
+        :class:`~bot_base.stats.EventStatistics`.
+
+        Defaults to ``None``, which disables event statistics
+    command_scheduler: Optional[CommandScheduler]
+        If provided, commands are run through this scheduler
+        rather than inline, bounding how many run at once and
+        sharing capacity fairly between guilds. Commands from
+        the Internal cog and bot owners use its priority lane.
+
+        Defaults to ``None``
+    process_offloader: Optional[ProcessOffloader]
+        Runs the functions given to :meth:`run_in_process`.
+
+        Defaults to a :class:`~bot_base.executors.ProcessOffloader`
+        with default settings, which starts no processes until used
+    thread_pools: Optional[Dict[str, int]]
+        The named thread pools :meth:`run_blocking` can use,
+        mapped to how many threads each pool may use.
+
+        Defaults to ``{"io": 16}``
+    command_stats: Optional[CommandStatistics]
+        The statistics to record command usage in, for example
+        to change how often they are flushed or how long
+        usage rollups are kept for.
+
+        Defaults to a :class:`~bot_base.stats.CommandStatistics`
+        with default settings, using ``db.command_usage`` and
+        ``db.command_usage_rollups``
 
     """
 
     def __init__(
         self,
         *args,
-        command_prefix: str,
+        command_prefix: Union[str, List[str]],
         leave_db: bool = False,
         do_command_stats: bool = True,
         mongo_url: Optional[str] = None,
         load_builtin_commands: bool = False,
         mongo_database_name: Optional[str] = None,
+        prefix_cache: Optional[Cache] = None,
+        prefix_not_found_ttl: Optional[datetime.timedelta] = datetime.timedelta(
+            hours=1
+        ),
+        load_prefix_cache_on_ready: bool = False,
+        raise_on_blacklisted: bool = True,
+        blacklist_sync_interval: Optional[float] = None,
+        compact_blacklist: bool = False,
+        skip_non_command_messages: bool = True,
+        lazy_message_wrapping: bool = False,
+        event_stats_sample_rate: Optional[float] = None,
+        command_scheduler: Optional[CommandScheduler] = None,
+        process_offloader: Optional[ProcessOffloader] = None,
+        thread_pools: Optional[Dict[str, int]] = None,
+        command_stats: Optional[CommandStatistics] = None,
         **kwargs,
     ) -> None:
         if not leave_db:
             self.db: MongoManager = MongoManager(mongo_url, mongo_database_name)
 
         self.do_command_stats: bool = do_command_stats
+        self.command_stats: Optional[CommandStatistics] = None
+        if do_command_stats and command_stats is not None:
+            self.command_stats = command_stats
+        elif do_command_stats:
+            try:
+                self.command_stats = CommandStatistics(
+                    self.db.command_usage,
+                    rollup_document=getattr(self.db, "command_usage_rollups", None),
+                )
+            except AttributeError:
+                log.warning(
+                    "You do not have command statistics setup. "
+                    "Please set `self.db` to a instance/subclass of MongoManager "
+                    "before calling (..., leave_db=True) if you wish to have "
+                    "command statistics."
+                )
+                self.do_command_stats = False
         try:
-            self.blacklist: BlacklistManager = BlacklistManager(self.db)
+            self.blacklist: BlacklistManager = BlacklistManager(
+                self.db,
+                sync_interval=blacklist_sync_interval,
+                compact=compact_blacklist,
+            )
         except AttributeError:
             log.warning(
                 "You do not have a blacklist setup. "
@@ -84,30 +222,86 @@ class BotBase(commands.Bot):
                 "calling (..., leave_db=True) if you wish to have a blacklist."
             )
             self.blacklist = None
+        self.raise_on_blacklisted: bool = raise_on_blacklisted
 
         self._uptime: datetime.datetime = datetime.datetime.now(
             tz=datetime.timezone.utc
         )
-        self.prefix_cache: TimedCache = TimedCache()
+        self.prefix_cache: Cache = (
+            prefix_cache if prefix_cache is not None else TimedCache()
+        )
+        # Guilds known to not have a custom prefix, non-lazy
+        # so entries don't pile up for guilds we never see again
+        self.prefix_not_found_cache: Optional[TimedCache] = (
+            TimedCache(global_ttl=prefix_not_found_ttl, lazy_eviction=False)
+            if prefix_not_found_ttl is not None
+            else None
+        )
+        # Guild id -> (prefix, matcher compiled from that prefix), so
+        # matchers are only rebuilt when prefix_cache changes
+        self._prefix_matchers: BoundedCache[
+            int, Tuple[Union[str, List[str]], PrefixMatcher]
+        ] = BoundedCache(4096)
+        # Concurrent lookups for the same guild share one query
+        self._prefix_loads: SingleFlight[int, Optional[Union[str, List[str]]]] = (
+            SingleFlight()
+        )
+        self._load_prefix_cache_on_ready: bool = load_prefix_cache_on_ready
+        self._has_loaded_prefix_cache: bool = False
 
-        self.DEFAULT_PREFIX: str = command_prefix
+        self.DEFAULT_PREFIX: Union[str, List[str]] = command_prefix
         kwargs["command_prefix"] = self.get_command_prefix
+        self._default_prefix_matcher: PrefixMatcher = PrefixMatcher(command_prefix)
+        self._default_prefix_source: Union[str, List[str]] = command_prefix
+        # Built once we know who we are after logging in
+        self._mention_prefixes: Optional[List[str]] = None
+        # Wrappers keyed by id() of what they wrap, so long lived objects
+        # such as channels are only wrapped once while something still
+        # holds a reference to their wrapper
+        self._wrapper_cache: "weakref.WeakValueDictionary[int, Meta]" = (
+            weakref.WeakValueDictionary()
+        )
+        self.skip_non_command_messages: bool = skip_non_command_messages
+        self.lazy_message_wrapping: bool = lazy_message_wrapping
+        self.command_scheduler: Optional[CommandScheduler] = command_scheduler
+        self.process_offloader: ProcessOffloader = (
+            process_offloader if process_offloader is not None else ProcessOffloader()
+        )
+        self.thread_pools: Dict[str, InstrumentedThreadPool] = {}
+        for name, max_workers in (thread_pools or {"io": 16}).items():
+            self.add_thread_pool(name, max_workers)
+        self.event_stats: Optional[EventStatistics] = (
+            EventStatistics(sample_rate=event_stats_sample_rate)
+            if event_stats_sample_rate is not None
+            else None
+        )
 
-        super().__init__(*args, **kwargs)
-
-        if load_builtin_commands:
-            self.load_extension("bot_base.cogs.internal")
-
+        wrap_message: Callable[[nextcord.Message], nextcord.Message] = (
+            self.get_lazy_wrapped_message
+            if lazy_message_wrapping
+            else self.get_wrapped_message
+        )
         # These events do include the on_ prefix
         self._single_event_type_sheet: Dict[str, Callable] = {
-            "on_message": self.get_wrapped_message,
+            "on_message": wrap_message,
         }
         self._double_event_type_sheet: Dict[str, Callable] = {
             "on_message_edit": lambda before, after: (
-                self.get_wrapped_message(before),
-                self.get_wrapped_message(after),
+                wrap_message(before),
+                wrap_message(after),
             )
         }
+        # Event name (without on_) -> argument wrapper, or None if the
+        # event is handled but not wrapped. Unhandled events are absent
+        self._dispatch_table: Dict[str, Optional[Callable[..., tuple]]] = {}
+        self._coalescers: Dict[str, EventCoalescer] = {}
+
+        super().__init__(*args, **kwargs)
+
+        if load_builtin_commands:
+            self.load_extension("bot_base.cogs.internal")
+
+        self.rebuild_dispatch_table()
 
     @property
     def uptime(self) -> datetime.datetime:
@@ -131,28 +325,107 @@ class BotBase(commands.Bot):
         return self.get_uptime()
 
     async def on_ready(self) -> None:
+        startup_tasks = []
         if self.blacklist:
-            await self.blacklist.initialize()
+            startup_tasks.append(self.blacklist.initialize())
+
+        if self._load_prefix_cache_on_ready and not self._has_loaded_prefix_cache:
+            startup_tasks.append(self._warm_prefix_cache())
+
+        await asyncio.gather(*startup_tasks)
+
+    async def _warm_prefix_cache(self) -> None:
+        await self.load_prefix_cache()
+        # on_ready fires again on reconnects, so only warm up
+        # once but retry on the next one if this failed
+        self._has_loaded_prefix_cache = True
+
+    async def load_prefix_cache(self) -> int:
+        """
+        Bulk load the prefixes for all guilds
+        this shard holds into the prefix cache.
+
+        Guilds without a prefix are also
+        added to the ``prefix_not_found_cache``.
+
+        Returns
+        -------
+        int
+            How many guild prefixes were loaded
+        """
+        start = time.perf_counter()
+        guild_ids = [guild.id for guild in self.guilds]
+        missing_prefixes = set(guild_ids)
+
+        loaded = 0
+        cursor = self.db.config.raw_collection.find(
+            {"_id": {"$in": guild_ids}},
+            {"_id": 1, "prefix": 1},
+            batch_size=1000,
+        )
+        async for entry in cursor:
+            prefix: Optional[Union[str, List[str]]] = entry.get("prefix")
+            if not prefix:
+                continue
+
+            self.prefix_cache.add_entry(entry["_id"], prefix, override=True)
+            missing_prefixes.discard(entry["_id"])
+            loaded += 1
+
+        if self.prefix_not_found_cache is not None:
+            for guild_id in missing_prefixes:
+                self.prefix_not_found_cache.add_entry(guild_id, None, override=True)
+
+        log.info(
+            "Loaded %s guild prefixes for %s guilds in %.2f seconds",
+            loaded,
+            len(guild_ids),
+            time.perf_counter() - start,
+        )
+        return loaded
 
     async def get_command_prefix(
         self, bot: "BotBase", message: nextcord.Message
     ) -> List[str]:
         try:
-            prefix = await self.get_guild_prefix(guild_id=message.guild.id)
+            matcher = await self.get_guild_prefix_matcher(guild_id=message.guild.id)
+        except (AttributeError, PrefixNotFound):
+            matcher = self.get_default_prefix_matcher()
 
-            prefix = self.get_case_insensitive_prefix(message.content, prefix)
+        prefix = matcher.match(message.content)
+        if prefix is not None:
+            # Return the prefix as the user typed it
+            # such that dpy will dispatch the given command
+            return [prefix]
 
-            return commands.when_mentioned_or(prefix)(self, message)
+        mention_prefixes = self.get_mention_prefixes()
+        return mention_prefixes if mention_prefixes else [matcher.prefixes[0]]
 
-        except (AttributeError, PrefixNotFound):
-            prefix = self.get_case_insensitive_prefix(
-                message.content, self.DEFAULT_PREFIX
-            )
-            return commands.when_mentioned_or(prefix)(self, message)
+    def get_default_prefix_matcher(self) -> PrefixMatcher:
+        """Returns the matcher for ``DEFAULT_PREFIX``."""
+        if self.DEFAULT_PREFIX is not self._default_prefix_source:
+            # DEFAULT_PREFIX was changed since we last built it
+            self._default_prefix_matcher = PrefixMatcher(self.DEFAULT_PREFIX)
+            self._default_prefix_source = self.DEFAULT_PREFIX
+
+        return self._default_prefix_matcher
+
+    def get_mention_prefixes(self) -> List[str]:
+        """Returns the prefixes for mentioning the bot,
+        empty if the bot isn't logged in yet."""
+        if self._mention_prefixes is None:
+            if not self.user:
+                # None or a missing sentinel depending on the library
+                return []
+
+            self._mention_prefixes = [f"<@{self.user.id}> ", f"<@!{self.user.id}> "]
+
+        return self._mention_prefixes
 
     @staticmethod
     def get_case_insensitive_prefix(content, prefix):
-        if content.casefold().startswith(prefix.casefold()):
+        # Only casefold what could be the prefix, not the entire message
+        if content[: len(prefix)].casefold() == prefix.casefold():
             # The prefix matches, now return the one the user used
             # such that dpy will dispatch the given command
             prefix_length = len(prefix)
@@ -165,6 +438,9 @@ class BotBase(commands.Bot):
         Using a cached property fetch prefixes
         for a guild and return em.
 
+        If the guild has multiple prefixes
+        this returns the first one.
+
         Parameters
         ----------
         guild_id : int
@@ -181,20 +457,121 @@ class BotBase(commands.Bot):
             We failed to find and
             return a valid prefix
         """
-        if guild_id in self.prefix_cache:
-            return self.prefix_cache.get_entry(guild_id)
+        matcher = await self.get_guild_prefix_matcher(guild_id)
+        return matcher.prefixes[0]
 
-        prefix_data = await self.db.config.find({"_id": guild_id})
+    async def get_guild_prefixes(self, guild_id: int) -> List[str]:
+        """
+        Returns every custom prefix for a guild.
+
+        Raises
+        ------
+        PrefixNotFound
+            The guild has no custom prefixes
+        """
+        matcher = await self.get_guild_prefix_matcher(guild_id)
+        return list(matcher.prefixes)
+
+    async def get_guild_prefix_matcher(self, guild_id: int) -> PrefixMatcher:
+        """
+        Returns the compiled prefixes for a guild.
 
-        if not prefix_data:
+        Raises
+        ------
+        PrefixNotFound
+            The guild has no custom prefixes
+        """
+        if guild_id in self.prefix_cache:
+            return self._get_prefix_matcher(
+                guild_id, self.prefix_cache.get_entry(guild_id)
+            )
+
+        if (
+            self.prefix_not_found_cache is not None
+            and guild_id in self.prefix_not_found_cache
+        ):
             raise PrefixNotFound
 
-        prefix: Optional[str] = prefix_data.get("prefix")
+        prefix = await self._prefix_loads.load(
+            guild_id,
+            functools.partial(self._fetch_guild_prefix, guild_id),
+            on_loaded=functools.partial(self._store_guild_prefix, guild_id),
+        )
         if not prefix:
             raise PrefixNotFound
 
+        return self._get_prefix_matcher(guild_id, prefix)
+
+    def _get_prefix_matcher(
+        self, guild_id: int, prefix: Union[str, List[str]]
+    ) -> PrefixMatcher:
+        if guild_id in self._prefix_matchers:
+            source, matcher = self._prefix_matchers.get_entry(guild_id)
+            if source is prefix:
+                return matcher
+
+        matcher = PrefixMatcher(prefix)
+        self._prefix_matchers.add_entry(guild_id, (prefix, matcher), override=True)
+        return matcher
+
+    async def _fetch_guild_prefix(
+        self, guild_id: int
+    ) -> Optional[Union[str, List[str]]]:
+        prefix_data = await self.db.config.find({"_id": guild_id})
+        return prefix_data.get("prefix") if prefix_data else None
+
+    def _store_guild_prefix(
+        self, guild_id: int, prefix: Optional[Union[str, List[str]]]
+    ) -> None:
+        # Only called for loads which weren't invalidated
+        # while in flight, so this never caches stale data
+        if prefix:
+            self.prefix_cache.add_entry(guild_id, prefix, override=True)
+        elif self.prefix_not_found_cache is not None:
+            self.prefix_not_found_cache.add_entry(guild_id, None, override=True)
+
+    async def set_guild_prefix(
+        self, guild_id: int, prefix: Union[str, List[str]]
+    ) -> None:
+        """
+        Persist a custom prefix for a guild
+        and update the prefix caches.
+
+        Parameters
+        ----------
+        guild_id: int
+            The guild to set a prefix for
+        prefix: Union[str, List[str]]
+            The guilds new prefix, or prefixes
+        """
+        # Compiled first so invalid prefixes are never stored
+        matcher = PrefixMatcher(prefix)
+        await self.db.config.upsert({"_id": guild_id}, {"prefix": prefix})
+        # Anything loaded before the upsert is now stale
+        self._prefix_loads.invalidate(guild_id)
         self.prefix_cache.add_entry(guild_id, prefix, override=True)
-        return prefix
+        self._prefix_matchers.add_entry(guild_id, (prefix, matcher), override=True)
+        if self.prefix_not_found_cache is not None:
+            self.prefix_not_found_cache.delete_entry(guild_id)
+
+    def invalidate_guild_prefix(self, guild_id: int) -> None:
+        """
+        Forget anything cached about a guilds prefix,
+        forcing the next lookup to hit the database.
+
+        Use this when a prefix is changed
+        outside of :meth:`set_guild_prefix`.
+
+        Parameters
+        ----------
+        guild_id: int
+            The guild to invalidate
+        """
+        self._prefix_loads.invalidate(guild_id)
+        self.prefix_cache.delete_entry(guild_id)
+        self._prefix_matchers.delete_entry(guild_id)
+        if self.prefix_not_found_cache is not None:
+            self.prefix_not_found_cache.delete_entry(guild_id)
 
     async def on_command_error(self, ctx: BotContext, error: DiscordException) -> None:
         """Generic error handling for common errors.
@@ -221,25 +598,9 @@ class BotBase(commands.Bot):
             await ctx.send(error.message)
 
         if not isinstance(error, commands.CommandNotFound) and self.do_command_stats:
-            if (
-                await self.db.command_usage.find(
-                    AQ(EQ("_id", ctx.command.qualified_name))
-                )
-                is None
-            ):
-                await self.db.command_usage.upsert(
-                    AQ(EQ("_id", ctx.command.qualified_name)),
-                    {
-                        "_id": ctx.command.qualified_name,
-                        "usage_count": 0,
-                        "failure_count": 1,
-                    },
-                )
-            else:
-                await self.db.command_usage.increment(
-                    AQ(EQ("_id", ctx.command.qualified_name)), "failure_count", 1
-                )
-
+            self.command_stats.record_failure(
+                ctx.command.qualified_name, duration=self._get_command_duration(ctx)
+            )
             log.debug(f"Command failed: `{ctx.command.qualified_name}`")
         raise error
 
@@ -249,26 +610,44 @@ class BotBase(commands.Bot):
             return
 
         if self.do_command_stats:
-            if (
-                await self.db.command_usage.find(
-                    AQ(EQ("_id", ctx.command.qualified_name))
-                )
-                is None
-            ):
-                await self.db.command_usage.upsert(
-                    AQ(EQ("_id", ctx.command.qualified_name)),
-                    {
-                        "_id": ctx.command.qualified_name,
-                        "usage_count": 1,
-                        "failure_count": 0,
-                    },
-                )
-            else:
-                await self.db.command_usage.increment(
-                    AQ(EQ("_id", ctx.command.qualified_name)), "usage_count", 1
-                )
+            self.command_stats.record_usage(
+                ctx.command.qualified_name, duration=self._get_command_duration(ctx)
+            )
         log.debug(f"Command executed: `{ctx.command.qualified_name}`")
 
+    @staticmethod
+    def _get_command_duration(ctx: BotContext) -> Optional[float]:
+        started_at: Optional[float] = getattr(ctx, "started_at", None)
+        if started_at is None:
+            return None
+
+        return time.perf_counter() - started_at
+
+    async def close(self) -> None:
+        """
+        Stops any scheduled commands, background work and
+        event coalescing, then writes any buffered command
+        statistics last so that nothing still running can
+        record statistics after they were written.
+        """
+        if self.blacklist:
+            await self.blacklist.close()
+
+        if self.command_scheduler is not None:
+            await self.command_scheduler.close()
+
+        self.process_offloader.close()
+        # Let blocking calls which already started finish up
+        await asyncio.gather(*(pool.close() for pool in self.thread_pools.values()))
+
+        for coalescer in self._coalescers.values():
+            coalescer.flush()
+
+        if self.command_stats is not None:
+            await self.command_stats.close()
+
+        await super().close()
+
     async def on_guild_join(self, guild: nextcord.Guild) -> None:
         """Leaves blacklisted guilds automatically."""
         if self.blacklist and guild.id in self.blacklist.guilds:
@@ -277,19 +656,12 @@ class BotBase(commands.Bot):
 
     async def process_commands(self, message: nextcord.Message) -> None:
         """Ignores commands from blacklisted users and guilds."""
-        ctx = await self.get_context(message, cls=BotContext)
-
-        if self.blacklist and ctx.author.id in self.blacklist.users:
-            log.debug(f"Ignoring blacklisted user: {ctx.author.id}")
-            raise BlacklistedEntry(f"Ignoring blacklisted user: {ctx.author.id}")
+        started_at = time.perf_counter()
+        if self.is_blacklisted(message):
+            return
 
-        if (
-            self.blacklist
-            and ctx.guild is not None
-            and ctx.guild.id in self.blacklist.guilds
-        ):
-            log.debug(f"Ignoring blacklisted guild: {ctx.guild.id}")
-            raise BlacklistedEntry(f"Ignoring blacklisted guild: {ctx.guild.id}")
+        ctx = await self.get_context(message, cls=BotContext)
+        ctx.started_at = started_at
 
         if ctx.command:
             log.debug(
@@ -298,25 +670,142 @@ class BotBase(commands.Bot):
                 ctx.author.id,
             )
 
-        await self.invoke(ctx)
+        if self.command_scheduler is None or ctx.command is None:
+            await self.invoke(ctx)
+            return
+
+        # User and guild ids never collide, so DMs are queued per user
+        key = ctx.guild.id if ctx.guild is not None else ctx.author.id
+        scheduled = await self.command_scheduler.submit(
+            key,
+            functools.partial(self.invoke, ctx),
+            priority=await self.is_priority_command(ctx),
+        )
+        if not scheduled:
+            log.debug(
+                "Dropped command %s for User(id=%s) as the queue is full",
+                ctx.command.qualified_name,
+                ctx.author.id,
+            )
+            self.dispatch("command_dropped", ctx)
+
+    async def is_priority_command(self, ctx: BotContext) -> bool:
+        """
+        Whether a command should use the priority lane of
+        :attr:`command_scheduler`, by default commands from
+        the Internal cog and anything invoked by a bot owner.
+        """
+        if ctx.command.cog_name == "Internal":
+            return True
+
+        return await self.is_owner(ctx.author)
 
     async def on_message(self, message: nextcord.Message) -> None:
         """Ignores messages from bots."""
-        if message.author.bot:
+        if self._get_raw_author(message).bot:
             log.debug("Ignoring a message from a bot.")
             return
 
+        # Checked before resolving prefixes or building a
+        # context so blacklisted spam never hits the database
+        if self.is_blacklisted(message):
+            return
+
+        if self.skip_non_command_messages and not self.could_be_command(message):
+            return
+
         await self.process_commands(message)
 
+    def could_be_command(self, message: nextcord.Message) -> bool:
+        """
+        A quick check of the first character of a message
+        against the prefixes it could be using.
+
+        Returns
+        -------
+        bool
+            ``False`` if the message definitely can't invoke a command,
+            ``True`` if it may and requires full processing.
+        """
+        content: str = message.content
+        if not content:
+            return False
+
+        if content[0] == "<":
+            # Possibly mentioning us
+            return True
+
+        if message.guild is None:
+            return self.get_default_prefix_matcher().could_match(content)
+
+        guild_id: int = message.guild.id
+        if guild_id in self.prefix_cache:
+            return self._get_prefix_matcher(
+                guild_id, self.prefix_cache.get_entry(guild_id)
+            ).could_match(content)
+
+        if (
+            self.prefix_not_found_cache is not None
+            and guild_id in self.prefix_not_found_cache
+        ):
+            return self.get_default_prefix_matcher().could_match(content)
+
+        # We don't know this guilds prefixes yet,
+        # so leave it to the full prefix resolution
+        return True
+
+    def is_blacklisted(self, message: nextcord.Message) -> bool:
+        """
+        Checks whether a message was sent by a
+        blacklisted user or within a blacklisted guild.
+
+        Parameters
+        ----------
+        message: nextcord.Message
+            The message to check
+
+        Returns
+        -------
+        bool
+            ``True`` if the message should be ignored
+
+        Raises
+        ------
+        BlacklistedEntry
+            The message is blacklisted and
+            ``raise_on_blacklisted`` is ``True``
+        """
+        if not self.blacklist:
+            return False
+
+        author_id: int = self._get_raw_author(message).id
+        if author_id in self.blacklist.users:
+            log.debug(f"Ignoring blacklisted user: {author_id}")
+            if self.raise_on_blacklisted:
+                raise BlacklistedEntry(f"Ignoring blacklisted user: {author_id}")
+
+            return True
+
+        if message.guild is not None and message.guild.id in self.blacklist.guilds:
+            log.debug(f"Ignoring blacklisted guild: {message.guild.id}")
+            if self.raise_on_blacklisted:
+                raise BlacklistedEntry(
+                    f"Ignoring blacklisted guild: {message.guild.id}"
+                )
+
+            return True
+
+        return False
+
     async def get_or_fetch_member(self, guild_id: int, member_id: int) -> WrappedMember:
         """Looks up a member in cache or fetches if not found."""
         guild = await self.get_or_fetch_guild(guild_id)
         member = guild.get_member(member_id)
         if member is not None:
-            return WrappedMember(member, bot=self)
+            return self._get_wrapper(member, WrappedMember)
 
         member = await guild.fetch_member(member_id)
-        return WrappedMember(member, bot=self)
+        return self._get_wrapper(member, WrappedMember)
 
     async def get_or_fetch_channel(self, channel_id: int) -> WrappedChannel:
         """Looks up a channel in cache or fetches if not found."""
@@ -340,27 +829,46 @@ class BotBase(commands.Bot):
         """Looks up a user in cache or fetches if not found."""
         user = self.get_user(user_id)
         if user:
-            return WrappedUser(user, bot=self)
+            return self._get_wrapper(user, WrappedUser)
 
         user = await self.fetch_user(user_id)
-        return WrappedUser(user, bot=self)
+        return self._get_wrapper(user, WrappedUser)
+
+    def _get_wrapper(self, item: Any, wrapper_cls: Type[W]) -> W:
+        if isinstance(item, Meta):
+            # Already wrapped
+            return item
+
+        key = id(item)
+        wrapper = self._wrapper_cache.get(key)
+        # The wrapper keeps item alive so its id can't have been
+        # reused, but check anyway in case the cache was bypassed
+        if (
+            wrapper is None
+            or wrapper._wrapped_item is not item
+            or type(wrapper) is not wrapper_cls
+        ):
+            wrapper = wrapper_cls(item, self)
+            self._wrapper_cache[key] = wrapper
+
+        return wrapper
 
     def get_wrapped_channel(
         self,
         channel: Union[abc.GuildChannel, abc.PrivateChannel, nextcord.Thread],
     ) -> Union[WrappedThread, WrappedChannel]:
         if isinstance(channel, nextcord.Thread):
-            return WrappedThread(channel, self)
+            return self._get_wrapper(channel, WrappedThread)
 
-        return WrappedChannel(channel, self)
+        return self._get_wrapper(channel, WrappedChannel)
 
     def get_wrapped_person(
         self, person: Union[nextcord.User, nextcord.Member]
     ) -> Union[WrappedUser, WrappedMember]:
         if isinstance(person, nextcord.Member):
-            return WrappedMember(person, self)
+            return self._get_wrapper(person, WrappedMember)
 
-        return WrappedUser(person, self)
+        return self._get_wrapper(person, WrappedUser)
 
     def get_wrapped_message(self, message: nextcord.Message) -> nextcord.Message:
         """
@@ -369,27 +877,346 @@ class BotBase(commands.Bot):
         These fields are:
         message.channel: Union[WrappedThread, WrappedChannel]
         message.author: Union[WrappedUser, WrappedMember]
+
+        Wrapping an already wrapped message does nothing.
         """
+        if isinstance(message, LazyWrappedMessage):
+            # Already wraps both fields on access
+            return message
+
+        if isinstance(message.channel, Meta) and isinstance(message.author, Meta):
+            return message
+
         message.channel = self.get_wrapped_channel(message.channel)
         message.author = self.get_wrapped_person(message.author)
 
         return message
 
+    def get_lazy_wrapped_message(self, message: nextcord.Message) -> LazyWrappedMessage:
+        """
+        Wrap message in a proxy which only wraps
+        message.channel and message.author once
+        they are first accessed.
+        """
+        if isinstance(message, LazyWrappedMessage):
+            return message
+
+        return LazyWrappedMessage(message, self)
+
+    @staticmethod
+    def _get_raw_author(
+        message: nextcord.Message,
+    ) -> Union[nextcord.User, nextcord.Member]:
+        # Our own checks don't need the wrapper, so
+        # avoid building one for lazily wrapped messages
+        if isinstance(message, LazyWrappedMessage):
+            return message._wrapped_item.author
+
+        return message.author
+
+    def add_event_wrapper(
+        self, event_name: str, wrapper: Callable, *, arguments: int = 1
+    ) -> None:
+        """
+        Wrap the arguments of an event before it is dispatched.
+
+        Parameters
+        ----------
+        event_name: str
+            The event to wrap, without the ``on_`` prefix.
+        wrapper: Callable
+            Called with the first ``arguments`` arguments of the event.
+            Returns the wrapped argument for single argument events,
+            otherwise a tuple of both wrapped arguments.
+
+            As always, two argument events are dispatched
+            with the bot as an extra third argument.
+        arguments: int
+            How many arguments to wrap, either 1 or 2.
+
+            Defaults to 1
+        """
+        if arguments not in (1, 2):
+            raise ValueError("Expected arguments to be either 1 or 2")
+
+        self.remove_event_wrapper(event_name)
+        sheet = (
+            self._single_event_type_sheet
+            if arguments == 1
+            else self._double_event_type_sheet
+        )
+        sheet[f"on_{event_name}"] = wrapper
+        self.rebuild_dispatch_table()
+
+    def remove_event_wrapper(self, event_name: str) -> None:
+        """Stop wrapping the arguments of an event, if they were wrapped."""
+        self._single_event_type_sheet.pop(f"on_{event_name}", None)
+        self._double_event_type_sheet.pop(f"on_{event_name}", None)
+        self.rebuild_dispatch_table()
+
+    def _get_event_wrapper(self, method: str) -> Optional[Callable[..., tuple]]:
+        single = self._single_event_type_sheet.get(method)
+        if single is not None:
+            return lambda first, *rest: (single(first), *rest)
+
+        double = self._double_event_type_sheet.get(method)
+        if double is not None:
+            # Passing the bot along is how these have always been dispatched
+            return lambda first, second, *_: (*double(first, second), self)
+
+        return None
+
+    def rebuild_dispatch_table(self) -> None:
+        """
+        Rebuild the table of events which have handlers.
+
+        This happens automatically when events, listeners,
+        cogs or extensions are added or removed. Handlers
+        added some other way, such as assigning ``on_``
+        methods to the bot, are picked up the first time
+        their event is dispatched.
+        """
+        methods = {
+            method
+            for method, listeners in getattr(self, "extra_events", {}).items()
+            if listeners
+        }
+        methods.update(name for name in dir(self) if name.startswith("on_"))
+        # So coalesced events can reuse their wrapper from the table
+        methods.update(f"on_{event_name}" for event_name in self._coalescers)
+        self._dispatch_table = {
+            method[3:]: self._get_event_wrapper(method) for method in methods
+        }
+
+    def event(self, coro):
+        coro = super().event(coro)
+        self.rebuild_dispatch_table()
+        return coro
+
+    def add_listener(self, *args, **kwargs) -> None:
+        super().add_listener(*args, **kwargs)
+        self.rebuild_dispatch_table()
+
+    def remove_listener(self, *args, **kwargs) -> None:
+        super().remove_listener(*args, **kwargs)
+        self.rebuild_dispatch_table()
+
+    def add_cog(self, *args, **kwargs) -> None:
+        super().add_cog(*args, **kwargs)
+        self.rebuild_dispatch_table()
+
+    def remove_cog(self, *args, **kwargs) -> Optional[commands.Cog]:
+        cog = super().remove_cog(*args, **kwargs)
+        self.rebuild_dispatch_table()
+        return cog
+
+    def unload_extension(self, *args, **kwargs) -> None:
+        # Module listeners are removed without going through remove_listener
+        super().unload_extension(*args, **kwargs)
+        self.rebuild_dispatch_table()
+
+    def reload_extension(self, *args, **kwargs) -> None:
+        super().reload_extension(*args, **kwargs)
+        self.rebuild_dispatch_table()
+
+    def coalesce_event(
+        self,
+        event_name: str,
+        *,
+        window: float = 1.0,
+        mode: CoalesceMode = CoalesceMode.ALL,
+        key: Optional[Callable[..., Any]] = None,
+    ) -> EventCoalescer:
+        """
+        Stop dispatching event_name individually, instead
+        dispatching ``<event_name>_batch`` once per window
+        with a list of the argument tuples of every event
+        dispatched in that window.
+
+        Listeners and waiters for event_name itself will no
+        longer be called, listen for the batch event instead.
+        Each tuple holds the arguments a listener for event_name
+        would have been called with, after any event wrappers.
+        Dispatches with keyword arguments are never coalesced.
+
+        .. code-block:: python
+
+            bot.coalesce_event("presence_update", mode=CoalesceMode.LATEST)
+
+            @bot.listen()
+            async def on_presence_update_batch(events):
+                for before, after in events:
+                    ...
+
+        Parameters
+        ----------
+        event_name: str
+            The event to coalesce, without the ``on_`` prefix.
+        window: float
+            How many seconds to collect events for before dispatching.
+
+            Defaults to 1 second
+        mode: CoalesceMode
+            Whether to keep every event, or only the latest per key.
+
+            Defaults to :attr:`CoalesceMode.ALL`
+        key: Optional[Callable[..., Hashable]]
+            Called with an events arguments to get the key it
+            is deduplicated on when using :attr:`CoalesceMode.LATEST`.
+
+            Defaults to the ``id`` of the first argument. For
+            ``typing`` that is the channel, so only the latest
+            typing event per channel is kept, pass
+            ``key=lambda channel, user, when: (channel.id, user.id)``
+            to keep the latest per user in each channel instead.
+
+        Returns
+        -------
+        EventCoalescer
+            The coalescer now handling this event
+        """
+        self.stop_coalescing(event_name)
+        coalescer = EventCoalescer(self, event_name, window=window, mode=mode, key=key)
+        self._coalescers[event_name] = coalescer
+        self.rebuild_dispatch_table()
+        return coalescer
+
+    def stop_coalescing(self, event_name: str) -> None:
+        """
+        Dispatch event_name individually again, anything
+        already buffered is dispatched as a final batch.
+        """
+        coalescer = self._coalescers.pop(event_name, None)
+        if coalescer is not None:
+            coalescer.flush()
+            self.rebuild_dispatch_table()
+
     def dispatch(self, event_name: str, *args: Any, **kwargs: Any) -> None:
-        _name = f"on_{event_name}"
-        # If we know the event, dispatch the wrapped one
-        if _name in self._single_event_type_sheet:
-            wrapped_arg = self._single_event_type_sheet[_name](args[0])
-            super().dispatch(event_name, wrapped_arg)  # type: ignore
-
-        elif _name in self._double_event_type_sheet:
-            wrapped_first_arg, wrapped_second_arg = self._double_event_type_sheet[
-                _name
-            ](args[0], args[1])
-            super().dispatch(event_name, wrapped_first_arg, wrapped_second_arg, self)
+        if self.event_stats is not None:
+            self.event_stats.record_event(event_name)
+
+        if self._coalescers:
+            coalescer = self._coalescers.get(event_name)
+            # Batches are lists of argument tuples, so events
+            # with keyword arguments are dispatched on their own
+            if coalescer is not None and not kwargs:
+                wrapper = self._dispatch_table.get(event_name)
+                coalescer.add(wrapper(*args) if wrapper is not None else args)
+                return
 
-        else:
-            super().dispatch(event_name, *args, **kwargs)  # type: ignore
+        wrapper = self._dispatch_table.get(event_name, _UNHANDLED)
+        if wrapper is _UNHANDLED:
+            method = f"on_{event_name}"
+            if hasattr(self, method) or self.extra_events.get(method):
+                # Added without going through the bot, such as by
+                # assigning it or editing extra_events directly
+                self.rebuild_dispatch_table()
+                wrapper = self._dispatch_table.get(event_name)
+
+            elif event_name not in self._listeners:
+                # Nothing handles this event, so unless
+                # something is waiting on it there is no work to do
+                return
+
+            else:
+                wrapper = self._get_event_wrapper(method)
+
+        if wrapper is not None:
+            args = wrapper(*args)
+
+        super().dispatch(event_name, *args, **kwargs)  # type: ignore
+
+    async def _run_event(
+        self, coro: Callable[..., Coroutine], event_name: str, *args, **kwargs
+    ) -> None:
+        if self.event_stats is not None and self.event_stats.should_sample():
+            coro = self.event_stats.time_listener(coro, event_name)
+
+        await super()._run_event(coro, event_name, *args, **kwargs)
+
+    async def run_in_process(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run a CPU bound function in :attr:`process_offloader`
+        so it doesn't block the event loop.
+
+        func and its arguments must be picklable to run in a
+        separate process, which generally means func should be
+        defined at the top level of a module. Anything else
+        runs in a thread instead.
+
+        Worker processes are spawned by default, importing your
+        main module again, so only create and run the bot under
+        ``if __name__ == "__main__":``.
+
+        .. code-block:: python
+
+            def render(data: bytes) -> bytes:
+                ...
+
+            image = await bot.run_in_process(render, data, timeout=10)
+
+        Refer to :meth:`ProcessOffloader.run` for parameters.
+        """
+        return await self.process_offloader.run(func, *args, timeout=timeout, **kwargs)
+
+    def add_thread_pool(self, name: str, max_workers: int) -> InstrumentedThreadPool:
+        """
+        Add a named thread pool for use with :meth:`run_blocking`.
+
+        Raises
+        ------
+        ValueError
+            A pool with this name already exists.
+        """
+        if name in self.thread_pools:
+            raise ValueError(f"A thread pool named {name!r} already exists")
+
+        pool = InstrumentedThreadPool(name, max_workers)
+        self.thread_pools[name] = pool
+        return pool
+
+    async def run_blocking(
+        self, func: Callable[..., Any], *args: Any, pool: str = "io", **kwargs: Any
+    ) -> Any:
+        """
+        Run a blocking function in one of :attr:`thread_pools`
+        so it doesn't block the event loop.
+
+        .. code-block:: python
+
+            data = await bot.run_blocking(requests.get, url, pool="io")
+
+        Parameters
+        ----------
+        func: Callable
+            The function to call with the given arguments.
+        pool: str
+            The name of the pool to run func in.
+
+            Defaults to ``io``
+
+        Returns
+        -------
+        Any
+            Whatever func returned.
+
+        Raises
+        ------
+        ValueError
+            No pool exists with this name.
+        """
+        try:
+            thread_pool = self.thread_pools[pool]
+        except KeyError:
+            raise ValueError(f"No thread pool named {pool!r} exists") from None
+
+        return await thread_pool.run(func, *args, **kwargs)
 
     def cancellable_wait_for(
         self, event: str, *, check=None, timeout: int = None
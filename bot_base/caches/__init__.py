@@ -1,2 +1,4 @@
 from bot_base.caches.entry import Entry
 from bot_base.caches.timed import TimedCache
+from bot_base.caches.bounded import BoundedCache, EvictionPolicy
+from bot_base.caches.single_flight import SingleFlight
@@ -0,0 +1,268 @@
+import heapq
+import itertools
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from enum import Enum
+from typing import Any, Dict, Optional, Generic, TypeVar, List, Tuple
+
+from bot_base.caches import Entry
+from bot_base.caches.abc import Cache
+from bot_base.exceptions import NonExistentEntry, ExistingEntry
+
+KT = TypeVar("KT", bound=Any)
+VT = TypeVar("VT", bound=Any)
+
+
+class EvictionPolicy(Enum):
+    """Which entry a :class:`BoundedCache` drops when full."""
+
+    LRU = "lru"
+    """Evict the least recently used entry."""
+    LFU = "lfu"
+    """Evict the least frequently used entry,
+    falling back to least recently used on ties."""
+
+
+class BoundedCache(Cache, Generic[KT, VT]):
+    __slots__ = (
+        "cache",
+        "max_entries",
+        "policy",
+        "global_ttl",
+        "_frequencies",
+        "_frequency_buckets",
+        "_min_frequency",
+        "_expiry_heap",
+        "_counter",
+    )
+
+    def __init__(
+        self,
+        max_entries: int,
+        *,
+        policy: EvictionPolicy = EvictionPolicy.LRU,
+        global_ttl: Optional[timedelta] = None,
+    ):
+        """
+        Parameters
+        ----------
+        max_entries: int
+            The maximum amount of entries to
+            hold before evicting old ones.
+        policy: EvictionPolicy
+            How to pick an entry to evict.
+
+            Defaults to LRU
+        global_ttl: Optional[timedelta]
+            A default TTL for any added entries.
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+
+        self.cache: "OrderedDict[KT, Entry]" = OrderedDict()
+        self.max_entries: int = max_entries
+        self.policy: EvictionPolicy = policy
+        self.global_ttl: Optional[timedelta] = global_ttl
+
+        # Only used for LFU, every key maps to its use count and
+        # every use count maps to its keys in least recently used order
+        self._frequencies: Dict[KT, int] = {}
+        self._frequency_buckets: Dict[int, "OrderedDict[KT, None]"] = {}
+        self._min_frequency: int = 0
+
+        # Entries with a ttl as (expiry_time, tie breaker, key, entry),
+        # so expired entries can be evicted before any live ones
+        self._expiry_heap: List[Tuple[float, int, KT, Entry]] = []
+        self._counter = itertools.count()
+
+    def __contains__(self, item: Any) -> bool:
+        try:
+            entry = self.cache[item]
+        except KeyError:
+            return False
+
+        if entry.expiry_time and entry.expiry_time < time.monotonic():
+            self._remove(item)
+            return False
+
+        return True
+
+    def __len__(self):
+        # Expired entries count until they are next looked
+        # up, cleaned or evicted to make room for new entries
+        return len(self.cache)
+
+    def add_entry(
+        self,
+        key: KT,
+        value: VT,
+        *,
+        ttl: Optional[timedelta] = None,
+        override: bool = False,
+    ) -> None:
+        """
+        Add an entry to the cache, evicting
+        another entry if the cache is full.
+
+        Parameters
+        ----------
+        key
+            The key to store this under.
+        value
+            The item you want to store in the cache
+        ttl: Optional[timedelta]
+            An optional period of time to expire
+            this entry after.
+        override: bool
+            Whether or not to override an existing value
+
+        Raises
+        ------
+        ExistingEntry
+            You are trying to insert a duplicate key
+
+        Notes
+        -----
+        ttl passed to this method will
+        take precendence over the global ttl.
+        """
+        exists = key in self
+        if exists and not override:
+            raise ExistingEntry
+
+        ttl = ttl or self.global_ttl
+        entry = Entry(
+            value=value,
+            expiry_time=time.monotonic() + ttl.total_seconds() if ttl else None,
+        )
+
+        if exists:
+            self.cache[key] = entry
+            self._touch(key)
+        else:
+            if len(self.cache) >= self.max_entries:
+                self._evict()
+
+            self.cache[key] = entry
+            if self.policy is EvictionPolicy.LFU:
+                self._frequencies[key] = 1
+                self._frequency_buckets.setdefault(1, OrderedDict())[key] = None
+                self._min_frequency = 1
+
+        if entry.expiry_time is not None:
+            self._push_expiry(key, entry)
+
+    def delete_entry(self, key: KT) -> None:
+        """
+        Delete a key from the cache
+
+        Parameters
+        ----------
+        key
+            The key to delete
+        """
+        if key in self.cache:
+            self._remove(key)
+
+    def get_entry(self, key: KT) -> VT:
+        """
+        Fetch a value from the cache,
+        marking it as used.
+
+        Parameters
+        ----------
+        key
+            The key you wish to
+            retrieve a value for
+
+        Returns
+        -------
+        VT
+            The provided value
+
+        Raises
+        ------
+        NonExistentEntry
+            No value exists in the cache
+            for the provided key.
+        """
+        if key not in self:
+            raise NonExistentEntry
+
+        self._touch(key)
+        return self.cache[key].value
+
+    def force_clean(self) -> None:
+        """
+        Clear out all outdated cache items.
+
+        Notes
+        -----
+        This only touches entries which have
+        actually expired, rather then the entire cache.
+        """
+        now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, _, key, entry = heapq.heappop(heap)
+            if self.cache.get(key) is entry:
+                self._remove(key)
+
+    def _push_expiry(self, key: KT, entry: Entry) -> None:
+        heapq.heappush(
+            self._expiry_heap, (entry.expiry_time, next(self._counter), key, entry)
+        )
+
+        # Overridden, deleted and evicted entries are left in the
+        # heap until they expire, so rebuild it if it outgrows the cache
+        if len(self._expiry_heap) > 2 * len(self.cache) + 64:
+            self._expiry_heap = [
+                item for item in self._expiry_heap if self.cache.get(item[2]) is item[3]
+            ]
+            heapq.heapify(self._expiry_heap)
+
+    def _touch(self, key: KT) -> None:
+        if self.policy is EvictionPolicy.LRU:
+            self.cache.move_to_end(key)
+            return
+
+        frequency = self._frequencies[key]
+        bucket = self._frequency_buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._frequency_buckets[frequency]
+            if self._min_frequency == frequency:
+                self._min_frequency = frequency + 1
+
+        self._frequencies[key] = frequency + 1
+        self._frequency_buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+
+    def _remove(self, key: KT) -> None:
+        del self.cache[key]
+        if self.policy is EvictionPolicy.LRU:
+            return
+
+        frequency = self._frequencies.pop(key)
+        bucket = self._frequency_buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self._frequency_buckets[frequency]
+
+    def _evict(self) -> None:
+        # Expired entries go first so they never push out live ones
+        self.force_clean()
+        if len(self.cache) < self.max_entries:
+            return
+
+        if self.policy is EvictionPolicy.LRU:
+            self.cache.popitem(last=False)
+            return
+
+        if self._min_frequency not in self._frequency_buckets:
+            # Only happens after an explicit delete emptied the
+            # lowest bucket, so this isn't on the usual put path
+            self._min_frequency = min(self._frequency_buckets)
+
+        key = next(iter(self._frequency_buckets[self._min_frequency]))
+        self._remove(key)
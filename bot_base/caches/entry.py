@@ -1,4 +1,3 @@
-from datetime import datetime
 from typing import Any, Optional
 
 import attr
@@ -7,4 +6,5 @@ import attr
 @attr.s(slots=True)
 class Entry:
     value: Any = attr.ib()
-    expiry_time: Optional[datetime] = attr.ib(default=None)
+    # Expiry as a time.monotonic() timestamp, None means never
+    expiry_time: Optional[float] = attr.ib(default=None)
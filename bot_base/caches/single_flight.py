@@ -0,0 +1,99 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+KT = TypeVar("KT", bound=Any)
+VT = TypeVar("VT", bound=Any)
+
+
+class SingleFlight(Generic[KT, VT]):
+    __slots__ = ("_in_flight",)
+
+    def __init__(self):
+        """
+        Shares a single call to a loader between everyone
+        concurrently asking for the same key, rather
+        then each of them loading the value.
+        """
+        self._in_flight: Dict[KT, "asyncio.Task[VT]"] = {}
+
+    def __contains__(self, item: Any) -> bool:
+        """
+        Returns True if a load for item is in flight.
+        """
+        return item in self._in_flight
+
+    async def load(
+        self,
+        key: KT,
+        loader: Callable[[], Awaitable[VT]],
+        *,
+        on_loaded: Optional[Callable[[VT], None]] = None,
+    ) -> VT:
+        """
+        Await loader, or the load already in flight for key.
+
+        Parameters
+        ----------
+        key: Any
+            The key being loaded
+        loader: Callable[[], Awaitable[Any]]
+            An async callable which returns the value,
+            it will be awaited at most once at a time per key.
+        on_loaded: Optional[Callable[[Any], None]]
+            Called with the loaded value, for example to
+            store it in a cache. Skipped if the key was
+            invalidated while the load was in flight.
+
+        Returns
+        -------
+        Any
+            The loaded value
+
+        Raises
+        ------
+        Exception
+            Anything raised by loader is raised
+            to every caller waiting on it.
+        """
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader, on_loaded))
+            self._in_flight[key] = task
+
+        # Shielded so one caller being cancelled
+        # doesn't cancel the load for everyone else
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: KT) -> None:
+        """
+        Detach any load in flight for key, so its result is
+        still returned to whoever is waiting on it but never
+        passed to on_loaded. The next load starts afresh.
+
+        Parameters
+        ----------
+        key: Any
+            The key to invalidate
+
+        Notes
+        -----
+        If nothing is in flight this does nothing.
+        """
+        self._in_flight.pop(key, None)
+
+    async def _load(
+        self,
+        key: KT,
+        loader: Callable[[], Awaitable[VT]],
+        on_loaded: Optional[Callable[[VT], None]],
+    ) -> VT:
+        task = asyncio.current_task()
+        try:
+            value = await loader()
+            if on_loaded is not None and self._in_flight.get(key) is task:
+                on_loaded(value)
+
+            return value
+        finally:
+            if self._in_flight.get(key) is task:
+                del self._in_flight[key]
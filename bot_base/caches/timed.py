@@ -1,5 +1,8 @@
-from datetime import timedelta, datetime
-from typing import Any, Dict, Optional, Generic, TypeVar
+import heapq
+import itertools
+import time
+from datetime import timedelta
+from typing import Any, Dict, Optional, Generic, TypeVar, List, Tuple
 
 from bot_base.caches import Entry
 from bot_base.caches.abc import Cache
@@ -10,7 +13,7 @@ VT = TypeVar("VT", bound=Any)
 
 
 class TimedCache(Cache, Generic[KT, VT]):
-    __slots__ = ("cache", "global_ttl", "non_lazy")
+    __slots__ = ("cache", "global_ttl", "non_lazy", "_expiry_heap", "_counter")
 
     def __init__(
         self,
@@ -32,10 +35,18 @@ class TimedCache(Cache, Generic[KT, VT]):
         self.non_lazy: bool = not lazy_eviction
         self.global_ttl: Optional[timedelta] = global_ttl
 
+        # A min-heap of (expiry_time, tie breaker, key, entry) so
+        # eviction only ever has to look at entries which expired.
+        # Entries which were overridden or deleted are left in the
+        # heap and skipped when popped as they no longer match
+        # the entry stored within the cache.
+        self._expiry_heap: List[Tuple[float, int, KT, Entry]] = []
+        self._counter = itertools.count()
+
     def __contains__(self, item: Any) -> bool:
         try:
             entry = self.cache[item]
-            if entry.expiry_time and entry.expiry_time < datetime.now():
+            if entry.expiry_time and entry.expiry_time < time.monotonic():
                 self.delete_entry(item)
                 return False
         except KeyError:
@@ -45,7 +56,7 @@ class TimedCache(Cache, Generic[KT, VT]):
 
     def __len__(self):
         self.force_clean()
-        return len(self.cache.keys())
+        return len(self.cache)
 
     def add_entry(
         self,
@@ -86,7 +97,11 @@ class TimedCache(Cache, Generic[KT, VT]):
 
         if ttl or self.global_ttl:
             ttl = ttl or self.global_ttl
-            self.cache[key] = Entry(value=value, expiry_time=(datetime.now() + ttl))
+            entry = Entry(
+                value=value, expiry_time=time.monotonic() + ttl.total_seconds()
+            )
+            self.cache[key] = entry
+            self._push_expiry(key, entry)
         else:
             self.cache[key] = Entry(value=value)
 
@@ -136,13 +151,32 @@ class TimedCache(Cache, Generic[KT, VT]):
     def force_clean(self) -> None:
         """
         Clear out all outdated cache items.
+
+        Notes
+        -----
+        This only touches entries which have
+        actually expired, rather then the entire cache.
         """
-        now = datetime.now()
-        self.cache = {
-            k: v
-            for k, v in self.cache.items()
-            if (v.expiry_time and v.expiry_time > now) or not v.expiry_time
-        }
+        now = time.monotonic()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, _, key, entry = heapq.heappop(heap)
+            if self.cache.get(key) is entry:
+                del self.cache[key]
+
+    def _push_expiry(self, key: KT, entry: Entry) -> None:
+        heapq.heappush(
+            self._expiry_heap, (entry.expiry_time, next(self._counter), key, entry)
+        )
+
+        # Stale heap items only get removed once they expire, so if
+        # keys are constantly overridden or deleted the heap can
+        # outgrow the cache. Rebuild it from live entries when it does.
+        if len(self._expiry_heap) > 2 * len(self.cache) + 64:
+            self._expiry_heap = [
+                item for item in self._expiry_heap if self.cache.get(item[2]) is item[3]
+            ]
+            heapq.heapify(self._expiry_heap)
 
     def _perform_eviction(self):
         if self.non_lazy:
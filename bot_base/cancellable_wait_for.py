@@ -1,8 +1,7 @@
 from __future__ import annotations
 
 import asyncio
-import secrets
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Optional, Tuple
 
 from bot_base import EventCancelled
 
@@ -10,6 +9,10 @@ if TYPE_CHECKING:
     from bot_base import BotBase
 
 
+def _always(*args) -> bool:
+    return True
+
+
 class CancellableWaitFor:
     def __init__(self, bot: BotBase, *, event, check=None, timeout=None):
         """Test"""
@@ -19,8 +22,11 @@ class CancellableWaitFor:
         self._check = check
         self._timeout = timeout
 
-        self.__is_running: bool = False
-        self.__cancel_key = secrets.token_hex(16)
+        self.__future: Optional[asyncio.Future] = None
+        self.__cancelled: bool = False
+        self.__timed_out: bool = False
+        # (event name, listener entry) while waiting
+        self.__entry: Optional[Tuple[str, tuple]] = None
 
         self.__result = None
 
@@ -50,53 +56,77 @@ class CancellableWaitFor:
         ------
         EventCancelled
             The waiting event was cancelled before a result was formed.
+        asyncio.TimeoutError
+            The event didn't happen within the timeout.
         """
-        if self.__is_running:
+        if self.__future is not None:
             raise RuntimeError(
                 "Cannot wait on this instance more then once, "
                 "possibly meant to wait on a `.copy()` of this instance?"
             )
 
         self.__result = None
-        self.__is_running = True
-        # ?tag multi wait for in discord.gg/dpy
-        done, pending = await asyncio.wait(
-            [
-                self.bot.loop.create_task(
-                    self.bot.wait_for(
-                        self._event, check=self._check, timeout=self._timeout
-                    )
-                ),
-                self.bot.loop.create_task(self.bot.wait_for(self.__cancel_key)),
-            ],
-            return_when=asyncio.FIRST_COMPLETED,
+        self.__cancelled = False
+        self.__timed_out = False
+
+        # Registered the same way as bot.wait_for, but we keep
+        # the future so it can be cancelled and unregistered directly
+        future = self.__future = asyncio.get_running_loop().create_future()
+        event = (
+            self._event.lower() if isinstance(self._event, str) else self._event.value
         )
+        entry = self.__entry = (event, (future, self._check or _always))
+        self.bot._listeners.setdefault(event, []).append(entry[1])
+
+        timer = None
+        if self._timeout is not None:
+            timer = asyncio.get_running_loop().call_later(
+                self._timeout, self._on_timeout
+            )
 
         try:
-            self.__is_running = False
-            result = done.pop().result()
-        except Exception as e:
-            self.__is_running = False
-            # If the first finished task died for any reason,
-            # the exception will be replayed here.
-            raise e
-
-        for future in done:
-            # If any exception happened in any other done tasks
-            # we don't care about the exception, but don't want the noise of
-            # non-retrieved exceptions
-            future.exception()
-
-        for future in pending:
-            future.cancel()
-
-        if result == self.__cancel_key:
-            # Event got cancelled
-            raise EventCancelled
+            result = await future
+        except asyncio.CancelledError:
+            if self.__timed_out:
+                raise asyncio.TimeoutError from None
+
+            if self.__cancelled:
+                raise EventCancelled from None
+
+            raise
+        finally:
+            self.__future = None
+            if timer is not None:
+                timer.cancel()
+
+            self._unregister(*entry)
 
         self.__result = result
         return result
 
     def cancel(self):
         """Cancel waiting for the event."""
-        self.bot.dispatch(self.__cancel_key, self.__cancel_key)
+        if self.__future is not None and not self.__future.done():
+            self.__cancelled = True
+            self.__future.cancel()
+            self._unregister(*self.__entry)
+
+    def _on_timeout(self) -> None:
+        if self.__future is not None and not self.__future.done():
+            self.__timed_out = True
+            self.__future.cancel()
+            self._unregister(*self.__entry)
+
+    def _unregister(self, event: str, entry: tuple) -> None:
+        # Dispatch may have already removed it, or the whole list
+        listeners = self.bot._listeners.get(event)
+        if not listeners:
+            return
+
+        try:
+            listeners.remove(entry)
+        except ValueError:
+            return
+
+        if not listeners:
+            self.bot._listeners.pop(event, None)
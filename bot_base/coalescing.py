@@ -0,0 +1,115 @@
+import asyncio
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bot_base import BotBase
+
+
+class CoalesceMode(Enum):
+    """What an :class:`EventCoalescer` keeps from a burst of events."""
+
+    ALL = "all"
+    """Keep the arguments of every event, in order."""
+    LATEST = "latest"
+    """Keep only the arguments of the latest event per key."""
+
+
+def _default_key(*args) -> Hashable:
+    return args[0].id
+
+
+class EventCoalescer:
+    __slots__ = (
+        "bot",
+        "event_name",
+        "batch_event_name",
+        "window",
+        "mode",
+        "key",
+        "_events",
+        "_latest",
+        "_timer",
+    )
+
+    def __init__(
+        self,
+        bot: "BotBase",
+        event_name: str,
+        *,
+        window: float = 1.0,
+        mode: CoalesceMode = CoalesceMode.ALL,
+        key: Optional[Callable[..., Hashable]] = None,
+    ):
+        """
+        Collects every dispatch of event_name within window seconds
+        of the first and dispatches them together as a single
+        ``<event_name>_batch`` event, with a list of the argument
+        tuples each event was dispatched with.
+
+        Parameters
+        ----------
+        bot: BotBase
+            The bot to dispatch batches with
+        event_name: str
+            The event to coalesce, without the ``on_`` prefix
+        window: float
+            How many seconds to collect events for before dispatching.
+
+            Defaults to 1 second
+        mode: CoalesceMode
+            Whether to keep every event, or only the latest per key.
+
+            Defaults to :attr:`CoalesceMode.ALL`
+        key: Optional[Callable[..., Hashable]]
+            Called with an events arguments to get the key it
+            is deduplicated on when using :attr:`CoalesceMode.LATEST`.
+
+            Defaults to the ``id`` of the first argument, which
+            may not be what identifies the event. For example
+            it's the channel for ``typing``, not the user.
+        """
+        self.bot: "BotBase" = bot
+        self.event_name: str = event_name
+        self.batch_event_name: str = f"{event_name}_batch"
+        self.window: float = window
+        self.mode: CoalesceMode = mode
+        self.key: Callable[..., Hashable] = key or _default_key
+
+        self._events: List[Tuple[Any, ...]] = []
+        self._latest: Dict[Hashable, Tuple[Any, ...]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return (
+            len(self._latest) if self.mode is CoalesceMode.LATEST else len(self._events)
+        )
+
+    def add(self, args: Tuple[Any, ...]) -> None:
+        """Buffer an events arguments until the window closes."""
+        if self.mode is CoalesceMode.LATEST:
+            key = self.key(*args)
+            # Re-inserted so the batch is ordered by latest update
+            self._latest.pop(key, None)
+            self._latest[key] = args
+        else:
+            self._events.append(args)
+
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        """Dispatch everything buffered so far as a single batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if self.mode is CoalesceMode.LATEST:
+            batch = list(self._latest.values())
+            self._latest.clear()
+        else:
+            batch = self._events
+            self._events = []
+
+        if batch:
+            self.bot.dispatch(self.batch_event_name, batch)
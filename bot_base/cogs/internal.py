@@ -1,4 +1,8 @@
+import io
+import itertools
 import logging
+import math
+from typing import Iterable, Set, Tuple
 
 from bot_base import BotBase
 from bot_base.context import BotContext
@@ -63,26 +67,81 @@ class Internal(commands.Cog):
             f"I have added the guild `{guild.id}` to the blacklist"
         )
 
+    @blacklist.group(name="import", invoke_without_command=True)
+    @commands.is_owner()
+    async def import_(self, ctx: BotContext) -> None:
+        """Blacklist every id within an attached file"""
+        await ctx.send_help(ctx.command)
+
+    @import_.command(name="person")
+    @commands.is_owner()
+    async def import_person(self, ctx: BotContext, *, reason=None) -> None:
+        """Blacklist every user id in the attached file.
+
+        The file should contain one id per line,
+        or be a csv with ids in the first column.
+        """
+        await self._import_ids(ctx, reason=reason, is_guild_blacklist=False)
+
+    @import_.command(name="guild")
+    @commands.is_owner()
+    async def import_guild(self, ctx: BotContext, *, reason=None) -> None:
+        """Blacklist every guild id in the attached file.
+
+        The file should contain one id per line,
+        or be a csv with ids in the first column.
+        """
+        await self._import_ids(ctx, reason=reason, is_guild_blacklist=True)
+
     @blacklist.command()
     @commands.is_owner()
-    async def list(self, ctx: BotContext) -> None:
-        """List all current blacklists"""
-        if self.bot.blacklist.users:
-            user_blacklists = "\n".join(f"`{u}`" for u in self.bot.blacklist.users)
-        else:
-            user_blacklists = "No user's blacklisted."
-
-        if self.bot.blacklist.guilds:
-            guild_blacklists = "\n".join(f"`{g}`" for g in self.bot.blacklist.guilds)
-        else:
-            guild_blacklists = "No guild's blacklisted."
+    async def export(self, ctx: BotContext) -> None:
+        """Export all current blacklists as files.
 
+        Each file is built in memory before it is sent,
+        taking roughly 20 bytes per blacklisted id.
+        """
         await ctx.send(
-            embed=discord.Embed(
-                title="Blacklists",
-                description=f"Users:\n{user_blacklists}\n\nGuilds:\n{guild_blacklists}",
-            )
+            files=[
+                discord.File(
+                    self._write_ids(self.bot.blacklist.users), filename="users.txt"
+                ),
+                discord.File(
+                    self._write_ids(self.bot.blacklist.guilds), filename="guilds.txt"
+                ),
+            ]
+        )
+
+    @blacklist.command()
+    @commands.is_owner()
+    async def list(self, ctx: BotContext, page: int = 1) -> None:
+        """List all current blacklists, a page at a time"""
+        per_page = 25
+        users = self.bot.blacklist.users
+        guilds = self.bot.blacklist.guilds
+
+        total_pages = max(math.ceil((len(users) + len(guilds)) / per_page), 1)
+        page = min(max(page, 1), total_pages)
+
+        # Only the entries on this page are ever formatted
+        entries: Iterable[Tuple[str, int]] = itertools.islice(
+            itertools.chain(
+                (("User", u) for u in users), (("Guild", g) for g in guilds)
+            ),
+            (page - 1) * per_page,
+            page * per_page,
         )
+        description = "\n".join(f"{kind}: `{i}`" for kind, i in entries)
+
+        embed = discord.Embed(
+            title="Blacklists",
+            description=description or "Nothing is blacklisted.",
+        )
+        embed.set_footer(
+            text=f"Page {page}/{total_pages} | "
+            f"{len(users)} users, {len(guilds)} guilds"
+        )
+        await ctx.send(embed=embed)
 
     @blacklist.group(invoke_without_command=True)
     @commands.is_owner()
@@ -114,6 +173,84 @@ class Internal(commands.Cog):
         )
         await ctx.send_basic_embed("I have completed that action for you.")
 
+    @commands.command()
+    @commands.is_owner()
+    async def events(self, ctx: BotContext, limit: int = 10) -> None:
+        """Show the most frequent events and the slowest listeners"""
+        stats = self.bot.event_stats
+        if stats is None:
+            await ctx.send_basic_embed(
+                "Event statistics are disabled, "
+                "set `event_stats_sample_rate` to enable them."
+            )
+            return
+
+        rates = stats.events_per_second()
+        lines = ["Events:"]
+        lines.extend(
+            f"  {event}: {count} ({rates[event]:.2f}/s)"
+            for event, count in stats.events.most_common(limit)
+        )
+        lines.append("Listeners by time spent holding the event loop:")
+        lines.extend(
+            f"  {listener} ({event}): {listener_stats.calls} calls, "
+            f"{listener_stats.mean_busy_ms:.2f}ms mean, "
+            f"{listener_stats.max_busy_ms:.2f}ms max, "
+            f"p95 {listener_stats.latency.p95}ms to complete"
+            for (event, listener), listener_stats in stats.slowest_listeners(limit)
+        )
+        content = "\n".join(lines)
+
+        footer = f"Timing {stats.sample_rate:.0%} of listener calls"
+        if len(content) > 4000:
+            await ctx.send(
+                footer,
+                file=discord.File(io.BytesIO(content.encode()), filename="events.txt"),
+            )
+            return
+
+        embed = discord.Embed(
+            title="Event statistics", description=f"```\n{content}\n```"
+        )
+        embed.set_footer(text=footer)
+        await ctx.send(embed=embed)
+
+    async def _import_ids(
+        self, ctx: BotContext, *, reason, is_guild_blacklist: bool
+    ) -> None:
+        if not ctx.message.attachments:
+            await ctx.send_basic_embed("Please attach a file of ids to import.")
+            return
+
+        ids: Set[int] = set()
+        for attachment in ctx.message.attachments:
+            content: str = (await attachment.read()).decode(errors="ignore")
+            for line in content.splitlines():
+                # Anything else is a header or otherwise invalid
+                value = line.split(",", 1)[0].strip().strip('"')
+                if value.isdigit():
+                    ids.add(int(value))
+
+        added = await self.bot.blacklist.bulk_add_to_blacklist(
+            ids, reason=reason, is_guild_blacklist=is_guild_blacklist
+        )
+        await ctx.send_basic_embed(
+            f"I have added {added} {'guilds' if is_guild_blacklist else 'users'} "
+            f"to the blacklist."
+        )
+
+    @staticmethod
+    def _write_ids(ids: Iterable[int]) -> io.BytesIO:
+        # Written in chunks to avoid building one huge string,
+        # the buffer itself still holds the entire file
+        buffer = io.BytesIO()
+        iterator = iter(ids)
+        while chunk := list(itertools.islice(iterator, 10_000)):
+            buffer.write("".join(f"{i}\n" for i in chunk).encode())
+
+        buffer.seek(0)
+        return buffer
+
 
 def setup(bot):
     bot.add_cog(Internal(bot))
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 try:
     from nextcord.ext import commands
@@ -18,3 +18,6 @@ class BotContext(commands.Context, Meta):
         self._wrapped_bot = bot
 
         self.message = bot.get_wrapped_message(self.message)
+
+        # When processing this context started, used for command statistics
+        self.started_at: Optional[float] = None
@@ -19,6 +19,9 @@ class MongoManager:
         # Documents
         self.user_blacklist = Document(self.db, "user_blacklist")
         self.guild_blacklist = Document(self.db, "guild_blacklist")
+        self.config = Document(self.db, "config")
+        self.command_usage = Document(self.db, "command_usage")
+        self.command_usage_rollups = Document(self.db, "command_usage_rollups")
 
     def typed_lookup(self, attr: str) -> Document:
         return getattr(self, attr)
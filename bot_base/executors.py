@@ -0,0 +1,337 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Set, TypeVar
+
+from bot_base.stats.histogram import LatencyHistogram
+
+log = logging.getLogger(__name__)
+T = TypeVar("T")
+
+
+def _call_pickled(payload: bytes) -> Any:
+    # Runs within the worker process
+    func, args, kwargs = pickle.loads(payload)
+    return func(*args, **kwargs)
+
+
+class ProcessOffloader:
+    def __init__(
+        self,
+        *,
+        max_workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        timeout: Optional[float] = None,
+        mp_context=None,
+    ):
+        """
+        Runs CPU bound functions in a process pool so
+        they don't block the event loop, falling back
+        to a thread pool for anything that can't be pickled.
+
+        Neither pool is started until it is first needed,
+        and a process pool which broke, for example because
+        a worker was killed, is replaced on the next call.
+
+        Worker processes are started with ``spawn`` by default,
+        which imports your main module again in every worker, so
+        it must create and run the bot within an
+        ``if __name__ == "__main__":`` block.
+
+        Parameters
+        ----------
+        max_workers: Optional[int]
+            How many processes, and fallback threads, to use.
+
+            Defaults to the number of processors on the machine
+        max_concurrency: Optional[int]
+            How many calls may be running or queued within
+            the pools at once, any more wait their turn.
+
+            Defaults to twice ``max_workers``
+        timeout: Optional[float]
+            The default number of seconds to wait for a result.
+
+            Defaults to waiting forever
+        mp_context
+            The multiprocessing context for the process pool.
+
+            Defaults to the ``spawn`` context, as forking a process
+            with a running event loop and threads can deadlock.
+            Pass ``multiprocessing.get_context("fork")`` to use
+            fork anyway, for example when the main module can't
+            be guarded as described above
+        """
+        self.max_workers: Optional[int] = max_workers
+        self.max_concurrency: Optional[int] = max_concurrency
+        self.timeout: Optional[float] = timeout
+        self.mp_context = (
+            mp_context
+            if mp_context is not None
+            else multiprocessing.get_context("spawn")
+        )
+
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending: Set[Future] = set()
+        self._closed: bool = False
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it belongs to the running loop
+        if self._semaphore is None:
+            limit = (
+                self.max_concurrency or (self.max_workers or os.cpu_count() or 1) * 2
+            )
+            self._semaphore = asyncio.Semaphore(limit)
+
+        return self._semaphore
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=self.mp_context
+            )
+
+        return self._process_pool
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bot_base_offload"
+            )
+
+        return self._thread_pool
+
+    def _submit(self, func: Callable, args, kwargs) -> Future:
+        try:
+            # Pickled here so that failures can be told apart
+            # from errors raised by func within the worker
+            payload = pickle.dumps((func, args, kwargs))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            log.debug(
+                "Running %r in a thread as it can't be pickled",
+                getattr(func, "__qualname__", func),
+            )
+            return self._get_thread_pool().submit(func, *args, **kwargs)
+
+        try:
+            return self._get_process_pool().submit(_call_pickled, payload)
+        except BrokenProcessPool:
+            # Otherwise every later call would fail until a restart
+            log.warning("The process pool is broken, replacing it")
+            self._process_pool.shutdown(wait=False)
+            self._process_pool = None
+            return self._get_process_pool().submit(_call_pickled, payload)
+
+    async def run(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> T:
+        """
+        Call func with the given arguments in the process pool.
+
+        Parameters
+        ----------
+        func: Callable
+            The function to call, ideally defined at the
+            top level of a module so it can be pickled.
+        timeout: Optional[float]
+            How many seconds to wait for a result, overriding
+            the default. Work that has already started can't be
+            interrupted and keeps its place until it finishes.
+
+        Returns
+        -------
+        Any
+            Whatever func returned.
+
+        Raises
+        ------
+        asyncio.TimeoutError
+            No result was returned in time.
+        RuntimeError
+            The offloader has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot run work on a closed offloader")
+
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        try:
+            future = self._submit(func, args, kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # Only free up capacity once the pool is actually done,
+        # rather than when the caller stops waiting
+        loop = asyncio.get_running_loop()
+
+        def on_done(_: Future) -> None:
+            self._pending.discard(future)
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(semaphore.release)
+
+        self._pending.add(future)
+        future.add_done_callback(on_done)
+
+        return await asyncio.wait_for(
+            asyncio.wrap_future(future),
+            timeout=timeout if timeout is not None else self.timeout,
+        )
+
+    def close(self) -> None:
+        """Cancel anything waiting to run and shut down the pools."""
+        self._closed = True
+        for future in list(self._pending):
+            future.cancel()
+
+        for pool in (self._process_pool, self._thread_pool):
+            if pool is not None:
+                pool.shutdown(wait=False)
+
+        self._process_pool = None
+        self._thread_pool = None
+
+
+class InstrumentedThreadPool:
+    def __init__(self, name: str, max_workers: int):
+        """
+        A named thread pool for blocking calls, which records how
+        long calls wait for a thread, how long they run for and
+        how often every thread was already busy.
+
+        The underlying threads aren't started until first needed.
+
+        Parameters
+        ----------
+        name: str
+            The name of this pool, also used to name its threads
+        max_workers: int
+            How many threads this pool may use
+        """
+        if max_workers < 1:
+            raise ValueError("Expected max_workers to be at least 1")
+
+        self.name: str = name
+        self.max_workers: int = max_workers
+
+        self.queue_wait: LatencyHistogram = LatencyHistogram()
+        """How long calls waited for a free thread."""
+        self.run_time: LatencyHistogram = LatencyHistogram()
+        """How long calls took once they had a thread."""
+        self.saturated: int = 0
+        """How many calls were submitted while every thread was busy."""
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Changed from worker threads, so guarded by a lock
+        self._lock: threading.Lock = threading.Lock()
+        self._queued: int = 0
+        self._active: int = 0
+        self._closed: bool = False
+
+    def __repr__(self):
+        return (
+            f"<InstrumentedThreadPool(name={self.name!r}, active={self.active}, "
+            f"queued={self.queued}, max_workers={self.max_workers})>"
+        )
+
+    @property
+    def active(self) -> int:
+        """How many calls are currently running."""
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        """How many calls are waiting for a thread."""
+        return self._queued
+
+    @property
+    def utilization(self) -> float:
+        """The fraction of threads currently in use."""
+        return self._active / self.max_workers
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=f"bot_base_{self.name}"
+            )
+
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Call func with the given arguments within this pool.
+
+        Raises
+        ------
+        RuntimeError
+            The pool has been closed.
+        """
+        if self._closed:
+            raise RuntimeError(f"Cannot run work on the closed {self.name} pool")
+
+        with self._lock:
+            if self._active + self._queued >= self.max_workers:
+                self.saturated += 1
+
+            self._queued += 1
+
+        submitted_at = time.perf_counter()
+        started_at: Optional[float] = None
+        finished_at: Optional[float] = None
+
+        def call() -> T:
+            nonlocal started_at, finished_at
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+
+            started_at = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finished_at = time.perf_counter()
+                with self._lock:
+                    self._active -= 1
+
+        try:
+            future = self._get_executor().submit(call)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+
+            raise
+
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            if future.cancel():
+                # Never started, so call won't undo the queued count
+                with self._lock:
+                    self._queued -= 1
+
+            # Histograms are only ever touched from the event loop
+            if started_at is not None:
+                self.queue_wait.record((started_at - submitted_at) * 1000)
+                if finished_at is not None:
+                    self.run_time.record((finished_at - started_at) * 1000)
+
+    async def close(self) -> None:
+        """Stop accepting calls and wait for any already submitted to finish."""
+        self._closed = True
+        if self._executor is None:
+            return
+
+        executor, self._executor = self._executor, None
+        await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
@@ -0,0 +1,90 @@
+from typing import Iterable, Tuple, Dict, Optional, Union
+
+# Marks a node in the trie where a prefix ends, casefolded
+# characters are never empty so this can't collide
+_END = ""
+
+
+class PrefixMatcher:
+    __slots__ = ("prefixes", "_trie")
+
+    def __init__(self, prefixes: Union[str, Iterable[str]]):
+        """
+        Matches messages against one or more prefixes case-insensitively.
+
+        The prefixes are compiled into a trie of casefolded characters,
+        so matching only ever looks at as many leading characters of
+        a message as the longest prefix has.
+
+        Parameters
+        ----------
+        prefixes: Union[str, Iterable[str]]
+            The prefix, or prefixes, to match against
+
+        Raises
+        ------
+        ValueError
+            No prefixes were given
+        """
+        if isinstance(prefixes, str):
+            prefixes = (prefixes,)
+
+        self.prefixes: Tuple[str, ...] = tuple(dict.fromkeys(p for p in prefixes if p))
+        if not self.prefixes:
+            raise ValueError("Expected at-least one prefix")
+
+        self._trie: Dict[str, dict] = {}
+        for prefix in self.prefixes:
+            node = self._trie
+            for char in prefix.casefold():
+                node = node.setdefault(char, {})
+
+            node[_END] = {}
+
+    def __repr__(self):
+        return f"<PrefixMatcher(prefixes={self.prefixes})>"
+
+    def __eq__(self, other):
+        if not isinstance(other, PrefixMatcher):
+            return NotImplemented
+
+        return self.prefixes == other.prefixes
+
+    def could_match(self, content: str) -> bool:
+        """
+        A cheap check of only the first character
+        of content, if this returns ``False`` then
+        :meth:`match` would return ``None``.
+        """
+        return bool(content) and content[0].casefold()[0] in self._trie
+
+    def match(self, content: str) -> Optional[str]:
+        """
+        Find the longest prefix content starts with.
+
+        Parameters
+        ----------
+        content: str
+            The message content to check
+
+        Returns
+        -------
+        Optional[str]
+            The prefix as the user typed it, such
+            that ``content.startswith`` the returned
+            value, or ``None`` if nothing matched.
+        """
+        node = self._trie
+        matched = None
+        for index, char in enumerate(content):
+            # Nearly always a single character, but some
+            # such as ß casefold into more then one
+            for folded in char.casefold():
+                node = node.get(folded)
+                if node is None:
+                    return matched
+
+            if _END in node:
+                matched = content[: index + 1]
+
+        return matched
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+from collections import Counter, deque
+from enum import Enum
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+log = logging.getLogger(__name__)
+
+
+class OverflowPolicy(Enum):
+    """What a :class:`CommandScheduler` does with work once a queue is full."""
+
+    DROP = "drop"
+    """Drop the work straight away."""
+    DEFER = "defer"
+    """Wait until there is space in the queue."""
+
+
+class CommandScheduler:
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 50,
+        max_queue_size: int = 25,
+        max_total_queued: int = 1000,
+        overflow_policy: OverflowPolicy = OverflowPolicy.DROP,
+    ):
+        """
+        Runs work with a global concurrency limit, queueing
+        anything over the limit per key and serving those
+        queues round-robin so no single key can starve the rest.
+
+        Work submitted with ``priority=True`` skips the
+        queues entirely and is always started next.
+
+        Parameters
+        ----------
+        max_concurrency: int
+            How many pieces of work may run at once.
+
+            Defaults to 50
+        max_queue_size: int
+            How much work may be queued for a single key.
+
+            Defaults to 25
+        max_total_queued: int
+            How much work may be queued across every key.
+
+            Defaults to 1000
+        overflow_policy: OverflowPolicy
+            What to do with work submitted to a full queue.
+
+            Defaults to :attr:`OverflowPolicy.DROP`
+        """
+        if max_concurrency < 1:
+            raise ValueError("Expected max_concurrency to be at least 1")
+
+        self.max_concurrency: int = max_concurrency
+        self.max_queue_size: int = max_queue_size
+        self.max_total_queued: int = max_total_queued
+        self.overflow_policy: OverflowPolicy = overflow_policy
+
+        self.dropped: Counter = Counter()
+        """How much work has been dropped per key."""
+
+        self._queues: Dict[Hashable, Deque[Callable[[], Awaitable]]] = {}
+        # Keys with queued work, in the order they will be served
+        self._rotation: Deque[Hashable] = deque()
+        self._priority: Deque[Callable[[], Awaitable]] = deque()
+        self._queued: int = 0
+        self._tasks: Set[asyncio.Task] = set()
+        # Resolved whenever work leaves a queue, for deferred submissions
+        self._space_available: Optional[asyncio.Future] = None
+        self._closed: bool = False
+
+    def __repr__(self):
+        return (
+            f"<CommandScheduler(running={self.running}, queued={self.queued}, "
+            f"max_concurrency={self.max_concurrency})>"
+        )
+
+    @property
+    def running(self) -> int:
+        """How much work is currently running."""
+        return len(self._tasks)
+
+    @property
+    def queued(self) -> int:
+        """How much work is waiting to run, including the priority lane."""
+        return self._queued + len(self._priority)
+
+    @property
+    def priority_queued(self) -> int:
+        """How much priority work is waiting to run."""
+        return len(self._priority)
+
+    def queue_depths(self) -> Dict[Hashable, int]:
+        """How much work is queued for each key with queued work."""
+        return {key: len(queue) for key, queue in self._queues.items()}
+
+    def deepest_queues(self, limit: int = 10) -> List[Tuple[Hashable, int]]:
+        """The keys with the most queued work, deepest first."""
+        return sorted(
+            self.queue_depths().items(), key=lambda item: item[1], reverse=True
+        )[:limit]
+
+    def is_full(self, key: Hashable) -> bool:
+        """Whether work submitted for key would overflow."""
+        if self._queued >= self.max_total_queued:
+            return True
+
+        queue = self._queues.get(key)
+        return queue is not None and len(queue) >= self.max_queue_size
+
+    async def submit(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable],
+        *,
+        priority: bool = False,
+    ) -> bool:
+        """
+        Queue func to be called and awaited once there is capacity.
+
+        Parameters
+        ----------
+        key: Hashable
+            What to queue this work under, such as a guild id.
+        func: Callable[[], Awaitable]
+            Called without arguments when it's this works turn to run.
+        priority: bool
+            Skip the queues and run this next, it is never dropped.
+
+        Returns
+        -------
+        bool
+            ``False`` if the work was dropped as the queue was full.
+
+        Raises
+        ------
+        RuntimeError
+            The scheduler has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("Cannot submit work to a closed scheduler")
+
+        if priority:
+            self._priority.append(func)
+            self._fill()
+            return True
+
+        while self.is_full(key):
+            if self.overflow_policy is OverflowPolicy.DROP:
+                self.dropped[key] += 1
+                log.debug("Dropped work for %s as its queue is full", key)
+                return False
+
+            if self._space_available is None:
+                self._space_available = asyncio.get_running_loop().create_future()
+
+            # Shielded as every deferred submission shares this future
+            await asyncio.shield(self._space_available)
+            if self._closed:
+                raise RuntimeError("Cannot submit work to a closed scheduler")
+
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._rotation.append(key)
+
+        queue.append(func)
+        self._queued += 1
+        self._fill()
+        return True
+
+    async def close(self) -> None:
+        """Drop anything queued and cancel anything running."""
+        self._closed = True
+        self._priority.clear()
+        self._queues.clear()
+        self._rotation.clear()
+        self._queued = 0
+        self._wake_deferred()
+
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _next(self) -> Optional[Callable[[], Awaitable]]:
+        if self._priority:
+            return self._priority.popleft()
+
+        if not self._rotation:
+            return None
+
+        key = self._rotation.popleft()
+        queue = self._queues[key]
+        func = queue.popleft()
+        self._queued -= 1
+        if queue:
+            # Back of the line until every other key has had a turn
+            self._rotation.append(key)
+        else:
+            del self._queues[key]
+
+        self._wake_deferred()
+        return func
+
+    def _fill(self) -> None:
+        while len(self._tasks) < self.max_concurrency:
+            func = self._next()
+            if func is None:
+                return
+
+            task = asyncio.create_task(self._run(func))
+            self._tasks.add(task)
+            task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not self._closed:
+            self._fill()
+
+    def _wake_deferred(self) -> None:
+        if self._space_available is not None:
+            self._space_available.set_result(None)
+            self._space_available = None
+
+    @staticmethod
+    async def _run(func: Callable[[], Awaitable]) -> None:
+        try:
+            await func()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("Scheduled work raised an exception")
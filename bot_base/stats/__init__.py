@@ -0,0 +1,10 @@
+from .histogram import LatencyHistogram
+from .command_stats import CommandStatistics
+from .event_stats import EventStatistics, ListenerStatistics
+
+__all__ = (
+    "CommandStatistics",
+    "EventStatistics",
+    "LatencyHistogram",
+    "ListenerStatistics",
+)
@@ -0,0 +1,313 @@
+import asyncio
+import datetime
+import logging
+from collections import Counter
+from typing import Optional, List, Dict, Tuple, Any
+
+from alaric import Document
+from pymongo import UpdateOne
+
+from bot_base.stats.histogram import LatencyHistogram
+
+log = logging.getLogger(__name__)
+
+
+class CommandStatistics:
+    def __init__(
+        self,
+        document: Document,
+        *,
+        flush_interval: float = 60,
+        max_pending: int = 500,
+        rollup_document: Optional[Document] = None,
+        hourly_retention: datetime.timedelta = datetime.timedelta(days=7),
+        daily_retention: datetime.timedelta = datetime.timedelta(days=90),
+    ):
+        """
+        Buffers command usage in memory and periodically
+        writes it to the database as a single bulk write.
+
+        Parameters
+        ----------
+        document: Document
+            The document to store command statistics in
+        flush_interval: float
+            How many seconds to wait in-between flushes.
+
+            Defaults to 60 seconds
+        max_pending: int
+            Flush early once this many command
+            invocations are waiting to be written.
+
+            Defaults to 500
+        rollup_document: Optional[Document]
+            If provided, also keep hourly and daily
+            usage totals per command in this document.
+        hourly_retention: datetime.timedelta
+            How long to keep hourly rollups for.
+
+            Defaults to 7 days
+        daily_retention: datetime.timedelta
+            How long to keep daily rollups for.
+
+            Defaults to 90 days
+        """
+        self.document: Document = document
+        self.flush_interval: float = flush_interval
+        self.max_pending: int = max_pending
+        self.rollup_document: Optional[Document] = rollup_document
+        self.retention: Dict[str, datetime.timedelta] = {
+            "hour": hourly_retention,
+            "day": daily_retention,
+        }
+
+        self._usage: Counter = Counter()
+        self._failures: Counter = Counter()
+        self._pending: int = 0
+        self._pending_latencies: Dict[str, LatencyHistogram] = {}
+        # (command name, start of hour) -> [usage_count, failure_count]
+        self._pending_rollups: Dict[Tuple[str, datetime.datetime], List[int]] = {}
+        self._has_rollup_index: bool = False
+
+        self.latencies: Dict[str, LatencyHistogram] = {}
+        """Latencies for every command since startup."""
+
+        # Created lazily so it belongs to the running loop
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_loop_task: Optional[asyncio.Task] = None
+        self._early_flush_task: Optional[asyncio.Task] = None
+        self._closed: bool = False
+
+    def record_usage(
+        self, command_name: str, *, duration: Optional[float] = None
+    ) -> None:
+        """Record a successful invocation of command_name
+        which optionally took duration seconds."""
+        self._usage[command_name] += 1
+        self._record_latency(command_name, duration)
+        self._record_rollup(command_name, 0)
+        self._on_record()
+
+    def record_failure(
+        self, command_name: str, *, duration: Optional[float] = None
+    ) -> None:
+        """Record a failed invocation of command_name
+        which optionally took duration seconds."""
+        self._failures[command_name] += 1
+        self._record_latency(command_name, duration)
+        self._record_rollup(command_name, 1)
+        self._on_record()
+
+    def get_latency(self, command_name: str) -> LatencyHistogram:
+        """Returns the latencies for a command since startup."""
+        return self.latencies.get(command_name, LatencyHistogram())
+
+    def slowest_commands(self, amount: int = 10) -> List[str]:
+        """Returns the commands with the highest p95 latency since startup."""
+        return sorted(
+            self.latencies, key=lambda c: self.latencies[c].p95, reverse=True
+        )[:amount]
+
+    async def get_usage_rollups(
+        self,
+        period: str = "hour",
+        *,
+        since: Optional[datetime.datetime] = None,
+        command_name: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch pre-aggregated command usage.
+
+        Parameters
+        ----------
+        period: str
+            Either ``hour`` or ``day``
+        since: Optional[datetime.datetime]
+            Only return rollups starting at or after this time
+        command_name: Optional[str]
+            Only return rollups for this command
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            The rollups, oldest first. Each contains the
+            ``command``, ``period``, ``start``, ``usage_count``
+            and ``failure_count``.
+
+        Raises
+        ------
+        ValueError
+            Rollups are not enabled or the period is unknown
+        """
+        if self.rollup_document is None:
+            raise ValueError("Rollups require a rollup_document")
+
+        if period not in self.retention:
+            raise ValueError(f"Unknown rollup period {period}")
+
+        query: Dict[str, Any] = {"period": period}
+        if since is not None:
+            query["start"] = {"$gte": since}
+        if command_name is not None:
+            query["command"] = command_name
+
+        cursor = self.rollup_document.raw_collection.find(
+            query, {"_id": 0, "expires_at": 0}
+        ).sort("start", 1)
+        return await cursor.to_list(None)
+
+    async def flush(self) -> None:
+        """Write all buffered statistics to the database."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            if not self._pending and not self._pending_rollups:
+                return
+
+            usage, self._usage = self._usage, Counter()
+            failures, self._failures = self._failures, Counter()
+            latencies, self._pending_latencies = self._pending_latencies, {}
+            rollups, self._pending_rollups = self._pending_rollups, {}
+            self._pending = 0
+
+            operations: List[UpdateOne] = []
+            for command_name in usage.keys() | failures.keys():
+                update = {
+                    "$inc": {
+                        "usage_count": usage[command_name],
+                        "failure_count": failures[command_name],
+                    }
+                }
+                if command_name in latencies:
+                    latency_update = latencies[command_name].as_update()
+                    update["$inc"].update(latency_update["$inc"])
+                    update["$max"] = latency_update["$max"]
+
+                operations.append(UpdateOne({"_id": command_name}, update, upsert=True))
+
+            try:
+                if operations:
+                    await self.document.raw_collection.bulk_write(
+                        operations, ordered=False
+                    )
+            except Exception:
+                # Keep the counts around for the next attempt
+                self._usage.update(usage)
+                self._failures.update(failures)
+                self._pending += sum(usage.values()) + sum(failures.values())
+                for command_name, histogram in latencies.items():
+                    self._pending_latencies.setdefault(
+                        command_name, LatencyHistogram()
+                    ).merge(histogram)
+                log.exception("Failed to write command statistics")
+
+            if rollups:
+                await self._write_rollups(rollups)
+
+    async def close(self) -> None:
+        """Stop the periodic flush and write any remaining statistics."""
+        self._closed = True
+        if self._flush_loop_task is not None:
+            self._flush_loop_task.cancel()
+            self._flush_loop_task = None
+
+        await self.flush()
+
+    async def _write_rollups(
+        self, rollups: Dict[Tuple[str, datetime.datetime], List[int]]
+    ) -> None:
+        # Daily rollups are built from the hourly ones
+        # so an event is only ever bucketed once
+        totals: Dict[Tuple[str, str, datetime.datetime], List[int]] = {}
+        for (command_name, hour), counts in rollups.items():
+            day = hour.replace(hour=0)
+            for key in ((command_name, "hour", hour), (command_name, "day", day)):
+                total = totals.setdefault(key, [0, 0])
+                total[0] += counts[0]
+                total[1] += counts[1]
+
+        operations: List[UpdateOne] = []
+        for (command_name, period, start), (usage, failures) in totals.items():
+            operations.append(
+                UpdateOne(
+                    {"_id": f"{command_name}:{period}:{start.isoformat()}"},
+                    {
+                        "$inc": {"usage_count": usage, "failure_count": failures},
+                        "$setOnInsert": {
+                            "command": command_name,
+                            "period": period,
+                            "start": start,
+                            "expires_at": start + self.retention[period],
+                        },
+                    },
+                    upsert=True,
+                )
+            )
+
+        try:
+            if not self._has_rollup_index:
+                # Mongo removes documents once expires_at has passed
+                await self.rollup_document.raw_collection.create_index(
+                    "expires_at", expireAfterSeconds=0
+                )
+                # Covers the filters and sort of get_usage_rollups
+                await self.rollup_document.raw_collection.create_index(
+                    [("period", 1), ("command", 1), ("start", 1)]
+                )
+                self._has_rollup_index = True
+
+            await self.rollup_document.raw_collection.bulk_write(
+                operations, ordered=False
+            )
+        except Exception:
+            for key, counts in rollups.items():
+                pending = self._pending_rollups.setdefault(key, [0, 0])
+                pending[0] += counts[0]
+                pending[1] += counts[1]
+            log.exception("Failed to write command usage rollups")
+
+    def _record_rollup(self, command_name: str, index: int) -> None:
+        if self.rollup_document is None:
+            return
+
+        hour = datetime.datetime.now(tz=datetime.timezone.utc).replace(
+            minute=0, second=0, microsecond=0
+        )
+        counts = self._pending_rollups.get((command_name, hour))
+        if counts is None:
+            counts = self._pending_rollups[(command_name, hour)] = [0, 0]
+
+        counts[index] += 1
+
+    def _record_latency(self, command_name: str, duration: Optional[float]) -> None:
+        if duration is None:
+            return
+
+        duration_ms = duration * 1000
+        for histograms in (self.latencies, self._pending_latencies):
+            histogram = histograms.get(command_name)
+            if histogram is None:
+                histogram = histograms[command_name] = LatencyHistogram()
+
+            histogram.record(duration_ms)
+
+    def _on_record(self) -> None:
+        self._pending += 1
+        if self._closed:
+            return
+
+        if self._flush_loop_task is None:
+            # Started lazily as commands are only
+            # ever recorded within a running loop
+            self._flush_loop_task = asyncio.create_task(self._flush_loop())
+
+        if self._pending >= self.max_pending and (
+            self._early_flush_task is None or self._early_flush_task.done()
+        ):
+            self._early_flush_task = asyncio.create_task(self.flush())
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
@@ -0,0 +1,160 @@
+import functools
+import random
+import time
+from collections import Counter
+from typing import Dict, List, Tuple, Callable, Any, Coroutine, Generator
+
+from bot_base.stats.histogram import LatencyHistogram
+
+
+class _StepTimer:
+    __slots__ = ("_coro", "busy")
+
+    def __init__(self, coro: Coroutine):
+        """
+        Drives a coroutine while timing each step it
+        takes, this is the time it holds the event loop.
+        """
+        self._coro: Coroutine = coro
+        self.busy: float = 0
+
+    def __await__(self) -> Generator[Any, Any, Any]:
+        coro = self._coro
+        send, error = None, None
+        while True:
+            start = time.perf_counter()
+            try:
+                if error is None:
+                    yielded = coro.send(send)
+                else:
+                    yielded = coro.throw(error)
+            except StopIteration as e:
+                return e.value
+            finally:
+                self.busy += time.perf_counter() - start
+
+            try:
+                send, error = (yield yielded), None
+            except BaseException as e:
+                send, error = None, e
+
+
+class ListenerStatistics:
+    __slots__ = ("latency", "busy_ms", "max_busy_ms")
+
+    def __init__(self):
+        """Timings for a single listener of a single event."""
+        self.latency: LatencyHistogram = LatencyHistogram()
+        """How long the listener took to complete."""
+        self.busy_ms: float = 0
+        """How long the listener held the event loop in total."""
+        self.max_busy_ms: float = 0
+
+    def __repr__(self):
+        return (
+            f"<ListenerStatistics(calls={self.calls}, "
+            f"mean_busy_ms={self.mean_busy_ms}, max_busy_ms={self.max_busy_ms})>"
+        )
+
+    @property
+    def calls(self) -> int:
+        """How many calls were sampled."""
+        return self.latency.count
+
+    @property
+    def mean_busy_ms(self) -> float:
+        return self.busy_ms / self.calls if self.calls else 0
+
+    def record(self, duration_ms: float, busy_ms: float) -> None:
+        self.latency.record(duration_ms)
+        self.busy_ms += busy_ms
+        if busy_ms > self.max_busy_ms:
+            self.max_busy_ms = busy_ms
+
+
+class EventStatistics:
+    def __init__(self, *, sample_rate: float = 0.1):
+        """
+        Counts dispatched events and times a
+        sample of the listeners handling them.
+
+        Parameters
+        ----------
+        sample_rate: float
+            The fraction of listener calls to time, between 0 and 1.
+            Every event is counted regardless.
+
+            Defaults to 0.1
+        """
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Expected sample_rate to be between 0 and 1")
+
+        self.sample_rate: float = sample_rate
+        self.events: Counter = Counter()
+        """How many times each event has been dispatched."""
+        self.listeners: Dict[Tuple[str, str], ListenerStatistics] = {}
+        """Timings keyed by (event method, listener name),
+        for example ``("on_message", "Cog.on_message")``."""
+        self.started_at: float = time.monotonic()
+
+    def reset(self) -> None:
+        """Clear everything recorded so far."""
+        self.events.clear()
+        self.listeners.clear()
+        self.started_at = time.monotonic()
+
+    def record_event(self, event_name: str) -> None:
+        self.events[event_name] += 1
+
+    def should_sample(self) -> bool:
+        """Whether the next listener call should be timed."""
+        return random.random() < self.sample_rate
+
+    def record_listener(
+        self, event_name: str, listener: str, duration_ms: float, busy_ms: float
+    ) -> None:
+        key = (event_name, listener)
+        stats = self.listeners.get(key)
+        if stats is None:
+            stats = self.listeners[key] = ListenerStatistics()
+
+        stats.record(duration_ms, busy_ms)
+
+    def time_listener(self, listener: Callable, event_name: str) -> Callable:
+        """
+        Returns listener wrapped so that the call
+        is recorded against event_name when awaited.
+        """
+        name: str = getattr(listener, "__qualname__", repr(listener))
+
+        @functools.wraps(listener)
+        async def timed(*args, **kwargs):
+            timer = _StepTimer(listener(*args, **kwargs))
+            start = time.perf_counter()
+            try:
+                return await timer
+            finally:
+                self.record_listener(
+                    event_name,
+                    name,
+                    (time.perf_counter() - start) * 1000,
+                    timer.busy * 1000,
+                )
+
+        return timed
+
+    def events_per_second(self) -> Dict[str, float]:
+        """The rate of each event since startup or the last reset."""
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {event: count / elapsed for event, count in self.events.items()}
+
+    def slowest_listeners(
+        self, limit: int = 10
+    ) -> List[Tuple[Tuple[str, str], ListenerStatistics]]:
+        """
+        Listeners ordered by the total time they held the
+        event loop for, the most likely to be starving it.
+        """
+        return sorted(
+            self.listeners.items(), key=lambda item: item[1].busy_ms, reverse=True
+        )[:limit]
@@ -0,0 +1,146 @@
+import math
+from bisect import bisect_left
+from typing import List, Dict, Any, Tuple
+
+LATENCY_BUCKETS: Tuple[int, ...] = (
+    1,
+    2,
+    5,
+    10,
+    25,
+    50,
+    100,
+    250,
+    500,
+    1000,
+    2500,
+    5000,
+    10000,
+    30000,
+    60000,
+)
+"""The upper bound of each histogram bucket in milliseconds,
+anything slower falls into a final overflow bucket."""
+
+
+class LatencyHistogram:
+    __slots__ = ("buckets", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        """
+        A fixed size histogram of command latencies,
+        accurate to the bucket a percentile falls in.
+        """
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count: int = 0
+        self.total_ms: float = 0
+        self.max_ms: float = 0
+
+    def __repr__(self):
+        return (
+            f"<LatencyHistogram(count={self.count}, p50={self.p50}, "
+            f"p95={self.p95}, p99={self.p99}, max={self.max_ms})>"
+        )
+
+    @staticmethod
+    def bucket_name(index: int) -> str:
+        """The key a bucket is stored under in the database."""
+        if index == len(LATENCY_BUCKETS):
+            return "inf"
+
+        return str(LATENCY_BUCKETS[index])
+
+    @classmethod
+    def from_document(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """
+        Build a histogram from the ``latency``
+        field of a stored document.
+        """
+        histogram = cls()
+        buckets = data.get("buckets", {})
+        for i in range(len(histogram.buckets)):
+            histogram.buckets[i] = buckets.get(cls.bucket_name(i), 0)
+
+        histogram.count = data.get("count", 0)
+        histogram.total_ms = data.get("total_ms", 0)
+        histogram.max_ms = data.get("max_ms", 0)
+        return histogram
+
+    def record(self, duration_ms: float) -> None:
+        """Add a single latency, in milliseconds."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, duration_ms)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the contents of other into this histogram."""
+        for i, amount in enumerate(other.buckets):
+            self.buckets[i] += amount
+
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Returns the upper bound of the bucket
+        the given percentile falls within.
+
+        Parameters
+        ----------
+        percentile: float
+            The percentile to get, between 0 and 1
+
+        Returns
+        -------
+        float
+            The latency in milliseconds,
+            never more then the max seen latency.
+        """
+        if not self.count:
+            return 0
+
+        rank = max(math.ceil(percentile * self.count), 1)
+        seen = 0
+        for i, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= rank:
+                if i == len(LATENCY_BUCKETS):
+                    break
+
+                return min(LATENCY_BUCKETS[i], self.max_ms)
+
+        return self.max_ms
+
+    @property
+    def p50(self) -> float:
+        return self.percentile(0.5)
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(0.95)
+
+    @property
+    def p99(self) -> float:
+        return self.percentile(0.99)
+
+    @property
+    def mean(self) -> float:
+        return self.total_ms / self.count if self.count else 0
+
+    def as_update(self, field: str = "latency") -> Dict[str, Dict[str, Any]]:
+        """
+        The ``$inc`` and ``$max`` operations
+        required to add this histogram to a
+        document stored with :meth:`from_document`.
+        """
+        increments: Dict[str, Any] = {
+            f"{field}.buckets.{self.bucket_name(i)}": amount
+            for i, amount in enumerate(self.buckets)
+            if amount
+        }
+        increments[f"{field}.count"] = self.count
+        increments[f"{field}.total_ms"] = self.total_ms
+        return {"$inc": increments, "$max": {f"{field}.max_ms": self.max_ms}}
@@ -3,5 +3,13 @@ from .meta import Meta
 from .member import WrappedMember
 from .user import WrappedUser
 from .thread import WrappedThread
+from .message import LazyWrappedMessage
 
-__all__ = ("WrappedChannel", "Meta", "WrappedMember", "WrappedUser", "WrappedThread")
+__all__ = (
+    "WrappedChannel",
+    "Meta",
+    "WrappedMember",
+    "WrappedUser",
+    "WrappedThread",
+    "LazyWrappedMessage",
+)
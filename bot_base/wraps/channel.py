@@ -10,9 +10,13 @@ except ModuleNotFoundError:
 from bot_base.wraps.meta import Meta
 
 
-class WrappedChannel(Meta, abc.GuildChannel, abc.PrivateChannel):  # noqa
+class WrappedChannel(
+    Meta, abc.GuildChannel, abc.PrivateChannel, forward_attributes=True
+):  # noqa
     """Wraps nextcord.TextChannel for ease of stuff"""
 
+    __slots__ = ("_wrapped_item", "_wrapped_bot")
+
     @classmethod
     async def convert(cls, ctx, argument: str) -> "WrappedChannel":
         channel: Union[
@@ -8,9 +8,11 @@ except ModuleNotFoundError:
 from bot_base.wraps.meta import Meta
 
 
-class WrappedMember(Meta, nextcord.Member):
+class WrappedMember(Meta, nextcord.Member, forward_attributes=True):
     """Wraps discord.Member for ease of stuff"""
 
+    __slots__ = ("_wrapped_item", "_wrapped_bot")
+
     @classmethod
     async def convert(cls, ctx, argument: str) -> "WrappedMember":
         member: nextcord.Member = await commands.MemberConverter().convert(
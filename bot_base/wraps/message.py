@@ -0,0 +1,60 @@
+from typing import Optional, Union
+
+try:
+    import nextcord
+    from nextcord import abc
+except ModuleNotFoundError:
+    import disnake as nextcord
+    from disnake import abc
+
+from bot_base.wraps.meta import Meta
+
+
+class LazyWrappedMessage(Meta, nextcord.Message, forward_attributes=True):
+    """
+    Wraps nextcord.Message, only wrapping the
+    channel and author when they are first accessed
+    """
+
+    __slots__ = (
+        "_wrapped_item",
+        "_wrapped_bot",
+        "_wrapped_channel",
+        "_wrapped_author",
+    )
+
+    def __init__(self, wrapped_item, bot):
+        super().__init__(wrapped_item, bot)
+        self._wrapped_channel: Optional[Meta] = None
+        self._wrapped_author: Optional[Meta] = None
+
+    @property
+    def channel(self) -> Union[abc.GuildChannel, abc.PrivateChannel, nextcord.Thread]:
+        if self._wrapped_channel is None:
+            self._wrapped_channel = self._wrapped_bot.get_wrapped_channel(
+                self._wrapped_item.channel
+            )
+
+        return self._wrapped_channel
+
+    @channel.setter
+    def channel(self, value) -> None:
+        self._wrapped_channel = None
+        self._wrapped_item.channel = value
+
+    @property
+    def author(self) -> Union[nextcord.User, nextcord.Member]:
+        if self._wrapped_author is None:
+            self._wrapped_author = self._wrapped_bot.get_wrapped_person(
+                self._wrapped_item.author
+            )
+
+        return self._wrapped_author
+
+    @author.setter
+    def author(self, value) -> None:
+        self._wrapped_author = None
+        self._wrapped_item.author = value
+
+    def __getattr__(self, item):
+        return getattr(self._wrapped_item, item)
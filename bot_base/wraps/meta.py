@@ -1,5 +1,6 @@
 import asyncio
-from typing import Optional, TYPE_CHECKING, Any
+from operator import attrgetter
+from typing import Optional, TYPE_CHECKING, Any, Dict, Set
 
 try:
     import nextcord
@@ -12,12 +13,84 @@ if TYPE_CHECKING:
     from bot_base import BotBase
 
 
+def _forward(name: str, writable: bool) -> property:
+    """Returns a property which forwards ``name`` to the wrapped item"""
+    # attrgetter keeps the common read path entirely in C
+    getter = attrgetter(f"_wrapped_item.{name}")
+    if not writable:
+        return property(getter)
+
+    def setter(self, value):
+        setattr(self._wrapped_item, name, value)
+
+    def deleter(self):
+        delattr(self._wrapped_item, name)
+
+    return property(getter, setter, deleter)
+
+
 class Meta:
     """
     Used to inject functionality into multiple
     class's and reduce code duplication
+
+    Subclasses created with ``forward_attributes=True`` get a
+    forwarding property for every public attribute the wrapped
+    library class defines, so reading ``.id`` or ``.guild`` no
+    longer has to fail a lookup before reaching ``__getattr__``.
+    Classmethods, staticmethods and private attributes are left
+    alone. These properties are read only unless the subclass is
+    also created with ``forward_writes=True``, in which case
+    assigning to them writes through to the wrapped item. Such
+    subclasses should declare ``_wrapped_item`` and ``_wrapped_bot``
+    within their own ``__slots__``, ``Meta`` only provides the
+    ``__weakref__`` slot as library classes such as ``Member``
+    already have a non-empty slot layout.
     """
 
+    __slots__ = ("__weakref__",)
+
+    def __init_subclass__(
+        cls,
+        forward_attributes: bool = False,
+        forward_writes: bool = False,
+        **kwargs,
+    ):
+        super().__init_subclass__(**kwargs)
+        if not forward_attributes:
+            return
+
+        # Anything we (or a subclass) define takes precedence
+        # over the library implementation, so it isn't forwarded
+        owned: Set[str] = set()
+        # Name -> the closest library definition, None if only annotated
+        library: Dict[str, Any] = {}
+        for klass in cls.__mro__:
+            if klass is object:
+                continue
+
+            if issubclass(klass, Meta):
+                owned.update(vars(klass))
+                owned.update(vars(klass).get("__annotations__", {}))
+                continue
+
+            for name in vars(klass).get("__annotations__", {}):
+                library.setdefault(name, None)
+
+            for name, value in vars(klass).items():
+                if library.get(name) is None:
+                    library[name] = value
+
+        for name, value in library.items():
+            if name in owned or name.startswith("_"):
+                continue
+
+            if isinstance(value, (classmethod, staticmethod)):
+                # These work the same on the wrapper class
+                continue
+
+            setattr(cls, name, _forward(name, forward_writes))
+
     def __init__(self, wrapped_item, bot: "BotBase"):
         self._wrapped_item = wrapped_item
         self._wrapped_bot = bot
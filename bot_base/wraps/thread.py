@@ -8,7 +8,9 @@ except ModuleNotFoundError:
 from bot_base.wraps import Meta
 
 
-class WrappedThread(Meta, nextcord.Thread):
+class WrappedThread(Meta, nextcord.Thread, forward_attributes=True):
+    __slots__ = ("_wrapped_item", "_wrapped_bot")
+
     @classmethod
     async def convert(cls, ctx, argument: str) -> "WrappedThread":
         _meta: nextcord.Thread = await commands.ThreadConverter().convert(
@@ -8,9 +8,11 @@ except ModuleNotFoundError:
 from bot_base.wraps.meta import Meta
 
 
-class WrappedUser(Meta, nextcord.User):
+class WrappedUser(Meta, nextcord.User, forward_attributes=True):
     """Wraps discord.user for ease of stuff"""
 
+    __slots__ = ("_wrapped_item", "_wrapped_bot")
+
     @classmethod
     async def convert(cls, ctx, argument: str) -> "WrappedUser":
         user: nextcord.User = await commands.UserConverter().convert(
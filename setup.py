@@ -44,6 +44,7 @@ setup(
         "bot_base.converters",
         "bot_base.cogs",
         "bot_base.paginators",
+        "bot_base.stats",
     ],
     install_requires=parse_requirements_file("requirements.txt"),
     classifiers=[
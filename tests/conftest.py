@@ -1,8 +1,29 @@
+from typing import AsyncIterator
+
 import pytest
+import pytest_asyncio
 
-from bot_base.caches import TimedCache
+from bot_base import BotBase
+from bot_base.caches import TimedCache, BoundedCache, EvictionPolicy
 
 
 @pytest.fixture
 def create_timed_cache() -> TimedCache:
     return TimedCache()
+
+
+@pytest.fixture
+def create_lru_cache() -> BoundedCache:
+    return BoundedCache(3, policy=EvictionPolicy.LRU)
+
+
+@pytest.fixture
+def create_lfu_cache() -> BoundedCache:
+    return BoundedCache(3, policy=EvictionPolicy.LFU)
+
+
+@pytest_asyncio.fixture
+async def create_bot() -> AsyncIterator[BotBase]:
+    bot = BotBase(command_prefix="!", leave_db=True)
+    yield bot
+    await bot.close()
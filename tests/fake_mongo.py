@@ -0,0 +1,112 @@
+"""A tiny in memory stand in for the motor collection methods used by bot_base."""
+
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for field, condition in query.items():
+        value = document.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+
+        for operator, operand in condition.items():
+            if operator == "$exists" and (field in document) != operand:
+                return False
+            if operator == "$gte" and (value is None or value < operand):
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self._documents = iter(documents)
+
+    def sort(self, key, direction=1):
+        self._documents = iter(
+            sorted(self._documents, key=lambda d: d[key], reverse=direction == -1)
+        )
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._documents)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class FakeCollection:
+    def __init__(self, *, fail: bool = False):
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self.indexes = []
+        # The operations passed to each bulk_write call
+        self.writes = []
+        # Makes bulk_write raise, as if the database was unreachable
+        self.fail: bool = fail
+
+    def find(self, query=None, projection=None, **kwargs) -> FakeCursor:
+        results = []
+        for document in self.documents.values():
+            if not _matches(document, query or {}):
+                continue
+
+            if projection:
+                document = {
+                    k: v
+                    for k, v in document.items()
+                    if projection.get(k, 0) or (k == "_id" and "_id" not in projection)
+                }
+            results.append(dict(document))
+
+        return FakeCursor(results)
+
+    async def update_one(self, query, update, upsert=False):
+        document = self.documents.get(query["_id"])
+        if document is None:
+            if not upsert:
+                return
+            document = {"_id": query["_id"]}
+            document.update(update.get("$setOnInsert", {}))
+        elif not _matches(document, query):
+            return
+
+        document.update(update.get("$set", {}))
+        for field, amount in update.get("$inc", {}).items():
+            document[field] = document.get(field, 0) + amount
+        for field, value in update.get("$max", {}).items():
+            document[field] = max(document.get(field, value), value)
+        for field in update.get("$unset", {}):
+            document.pop(field, None)
+
+        self.documents[query["_id"]] = document
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.fail:
+            raise ValueError
+
+        self.writes.append(operations)
+        for operation in operations:
+            await self.update_one(
+                operation._filter, operation._doc, upsert=operation._upsert
+            )
+
+    async def create_index(self, *args, **kwargs):
+        self.indexes.append((args, kwargs))
+
+
+def fake_document() -> SimpleNamespace:
+    return SimpleNamespace(raw_collection=FakeCollection())
+
+
+def fake_db() -> SimpleNamespace:
+    return SimpleNamespace(
+        user_blacklist=fake_document(), guild_blacklist=fake_document()
+    )
@@ -0,0 +1,188 @@
+import asyncio
+import datetime
+
+import pytest
+
+from bot_base.blacklist import BlacklistManager, CompactIdSet
+from tests.fake_mongo import fake_db
+
+
+@pytest.fixture
+def create_blacklist() -> BlacklistManager:
+    return BlacklistManager(fake_db())  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_add_and_remove(create_blacklist):
+    await create_blacklist.add_to_blacklist(1, is_guild_blacklist=True)
+    await create_blacklist.add_to_blacklist(2, is_guild_blacklist=False)
+
+    assert 1 in create_blacklist.guilds
+    assert 2 in create_blacklist.users
+    assert 2 in create_blacklist
+
+    await create_blacklist.remove_from_blacklist(2, is_guild_blacklist=False)
+    assert 2 not in create_blacklist
+
+    stored = create_blacklist.db.user_blacklist.raw_collection.documents[2]
+    assert "removed_at" in stored
+
+
+@pytest.mark.asyncio
+async def test_initialize_skips_tombstones(create_blacklist):
+    await create_blacklist.add_to_blacklist(1)
+    await create_blacklist.add_to_blacklist(2)
+    await create_blacklist.remove_from_blacklist(2)
+
+    other = BlacklistManager(create_blacklist.db)
+    await other.initialize()
+    assert other.guilds == {1}
+
+
+@pytest.mark.asyncio
+async def test_incremental_sync(create_blacklist):
+    other = BlacklistManager(create_blacklist.db)
+    await create_blacklist.initialize()
+    await other.initialize()
+
+    await create_blacklist.add_to_blacklist(1)
+    await create_blacklist.add_to_blacklist(2, is_guild_blacklist=False)
+    await other.initialize()
+    assert other.guilds == {1}
+    assert other.users == {2}
+
+    await create_blacklist.remove_from_blacklist(1)
+    await other.sync()
+    assert not other.guilds
+
+
+@pytest.mark.asyncio
+async def test_sync_ignores_old_changes(create_blacklist):
+    collection = create_blacklist.db.guild_blacklist.raw_collection
+    await create_blacklist.initialize()
+
+    # Another process changed this long before our last sync
+    collection.documents[5] = {
+        "_id": 5,
+        "updated_at": datetime.datetime.now(tz=datetime.timezone.utc)
+        - datetime.timedelta(days=1),
+    }
+    await create_blacklist.sync()
+    assert 5 not in create_blacklist.guilds
+
+
+def test_apply_change(create_blacklist):
+    create_blacklist.apply_change(1, is_guild_blacklist=False, removed=False)
+    assert create_blacklist.users == {1}
+
+    create_blacklist.apply_change(1, is_guild_blacklist=False, removed=True)
+    assert not create_blacklist.users
+
+
+@pytest.mark.asyncio
+async def test_compact_backend(create_blacklist):
+    for i in (30, 10, 20):
+        await create_blacklist.add_to_blacklist(i, is_guild_blacklist=False)
+
+    compact = BlacklistManager(create_blacklist.db, compact=True)
+    await compact.initialize()
+
+    assert isinstance(compact.users, CompactIdSet)
+    assert list(compact.users) == [10, 20, 30]
+    assert 20 in compact
+
+    await compact.remove_from_blacklist(20, is_guild_blacklist=False)
+    assert 20 not in compact
+
+
+def _in(seconds: float) -> datetime.datetime:
+    return datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(
+        seconds=seconds
+    )
+
+
+@pytest.mark.asyncio
+async def test_temporary_entries(create_blacklist):
+    await create_blacklist.add_to_blacklist(1, expires_at=_in(0.5))
+    await create_blacklist.add_to_blacklist(2, expires_at=_in(0.2))
+    await create_blacklist.add_to_blacklist(3, is_guild_blacklist=False)
+    assert create_blacklist.guilds == {1, 2}
+
+    stored = create_blacklist.db.guild_blacklist.raw_collection.documents[1]
+    assert "expires_at" in stored
+
+    await asyncio.sleep(0.3)
+    assert create_blacklist.guilds == {1}
+
+    await asyncio.sleep(0.3)
+    assert not create_blacklist.guilds
+    assert create_blacklist.users == {3}
+    await create_blacklist.close()
+
+
+@pytest.mark.asyncio
+async def test_readding_clears_expiry(create_blacklist):
+    await create_blacklist.add_to_blacklist(1, expires_at=_in(0.1))
+    await create_blacklist.add_to_blacklist(1)
+
+    await asyncio.sleep(0.2)
+    assert 1 in create_blacklist
+    stored = create_blacklist.db.guild_blacklist.raw_collection.documents[1]
+    assert "expires_at" not in stored
+
+
+@pytest.mark.asyncio
+async def test_initialize_schedules_expiry(create_blacklist):
+    await create_blacklist.add_to_blacklist(1, expires_at=_in(0.2))
+    await create_blacklist.add_to_blacklist(2, expires_at=_in(-5))
+
+    other = BlacklistManager(create_blacklist.db)
+    await other.initialize()
+    assert other.guilds == {1}
+
+    indexes = create_blacklist.db.guild_blacklist.raw_collection.indexes
+    assert (("expires_at",), {"expireAfterSeconds": 0}) in indexes
+    assert (("updated_at",), {}) in indexes
+
+    await asyncio.sleep(0.3)
+    assert not other.guilds
+    await create_blacklist.close()
+
+
+@pytest.mark.asyncio
+async def test_bulk_add(create_blacklist):
+    await create_blacklist.add_to_blacklist(
+        1, is_guild_blacklist=False, expires_at=_in(0.1)
+    )
+    added = await create_blacklist.bulk_add_to_blacklist(
+        [1, 2, 3, 3], is_guild_blacklist=False
+    )
+    # 1 was already blacklisted
+    assert added == 2
+    assert create_blacklist.users == {1, 2, 3}
+
+    documents = create_blacklist.db.user_blacklist.raw_collection.documents
+    assert set(documents) == {1, 2, 3}
+    assert "expires_at" not in documents[1]
+
+    # No longer temporary
+    await asyncio.sleep(0.2)
+    assert 1 in create_blacklist.users
+    assert await create_blacklist.bulk_add_to_blacklist([]) == 0
+
+
+def test_apply_change_outside_event_loop(create_blacklist):
+    create_blacklist.apply_change(
+        1, is_guild_blacklist=True, removed=False, expires_at=_in(0.1)
+    )
+    assert create_blacklist.guilds == {1}
+
+    async def expire():
+        create_blacklist.apply_change(
+            2, is_guild_blacklist=True, removed=False, expires_at=_in(60)
+        )
+        await asyncio.sleep(0.2)
+        await create_blacklist.close()
+
+    asyncio.run(expire())
+    assert create_blacklist.guilds == {2}
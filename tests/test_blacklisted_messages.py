@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.blacklist import BlacklistManager
+from bot_base.exceptions import BlacklistedEntry
+from tests.fake_mongo import fake_db
+
+
+def create_blacklisted_bot(**kwargs) -> BotBase:
+    bot = BotBase(command_prefix="!", leave_db=True, **kwargs)
+    bot.blacklist = BlacklistManager(fake_db())
+    bot.blacklist.apply_change(1, is_guild_blacklist=False, removed=False)
+    bot.blacklist.apply_change(10, is_guild_blacklist=True, removed=False)
+
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("Blacklisted messages should be rejected first")
+
+    bot.get_prefix = unexpected
+    bot.get_context = unexpected
+    return bot
+
+
+def create_message(author_id: int, guild_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        content="!ping",
+        author=SimpleNamespace(id=author_id, bot=False),
+        guild=SimpleNamespace(id=guild_id),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("author_id, guild_id", [(1, 20), (2, 10)])
+async def test_rejected_before_prefixes(author_id, guild_id):
+    bot = create_blacklisted_bot()
+    message = create_message(author_id, guild_id)
+
+    with pytest.raises(BlacklistedEntry):
+        await bot.on_message(message)
+
+    with pytest.raises(BlacklistedEntry):
+        await bot.process_commands(message)
+
+    await bot.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("author_id, guild_id", [(1, 20), (2, 10)])
+async def test_silently_ignored(author_id, guild_id):
+    bot = create_blacklisted_bot(raise_on_blacklisted=False)
+    message = create_message(author_id, guild_id)
+
+    assert await bot.on_message(message) is None
+    assert await bot.process_commands(message) is None
+    await bot.close()
@@ -0,0 +1,116 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+from bot_base import NonExistentEntry, ExistingEntry
+from bot_base.caches import BoundedCache, EvictionPolicy
+from bot_base.caches.abc import Cache
+
+
+def test_is_cache(create_lru_cache):
+    assert isinstance(create_lru_cache, Cache)
+
+
+def test_max_entries():
+    with pytest.raises(ValueError):
+        BoundedCache(0)
+
+
+def test_cache_add(create_lru_cache):
+    create_lru_cache.add_entry("key", "value")
+    assert create_lru_cache.get_entry("key") == "value"
+
+    with pytest.raises(ExistingEntry):
+        create_lru_cache.add_entry("key", "different value")
+
+    create_lru_cache.add_entry("key", "A third value", override=True)
+    assert create_lru_cache.get_entry("key") == "A third value"
+    assert len(create_lru_cache) == 1
+
+
+def test_delete_entry(create_lfu_cache):
+    create_lfu_cache.add_entry("key", "value")
+    create_lfu_cache.delete_entry("key")
+    assert "key" not in create_lfu_cache
+
+    # Idempotent
+    create_lfu_cache.delete_entry("key")
+
+    with pytest.raises(NonExistentEntry):
+        create_lfu_cache.get_entry("key")
+
+
+def test_lru_eviction(create_lru_cache):
+    for i in range(3):
+        create_lru_cache.add_entry(i, i)
+
+    # 0 is now the most recently used
+    create_lru_cache.get_entry(0)
+    create_lru_cache.add_entry(3, 3)
+
+    assert len(create_lru_cache) == 3
+    assert 1 not in create_lru_cache
+    assert 0 in create_lru_cache
+
+
+def test_lfu_eviction(create_lfu_cache):
+    for i in range(3):
+        create_lfu_cache.add_entry(i, i)
+
+    create_lfu_cache.get_entry(0)
+    create_lfu_cache.get_entry(0)
+    create_lfu_cache.get_entry(2)
+    create_lfu_cache.add_entry(3, 3)
+
+    assert len(create_lfu_cache) == 3
+    assert 1 not in create_lfu_cache
+
+    # 3 is the only entry used once
+    create_lfu_cache.add_entry(4, 4)
+    assert 3 not in create_lfu_cache
+    assert {0, 2, 4} == set(create_lfu_cache.cache)
+
+
+def test_lfu_eviction_after_delete(create_lfu_cache):
+    for i in range(3):
+        create_lfu_cache.add_entry(i, i)
+        create_lfu_cache.get_entry(i)
+
+    create_lfu_cache.delete_entry(0)
+    create_lfu_cache.get_entry(1)
+    create_lfu_cache.add_entry(3, 3)
+    create_lfu_cache.add_entry(4, 4)
+
+    assert {1, 2, 4} == set(create_lfu_cache.cache)
+
+
+@pytest.mark.asyncio
+async def test_ttl():
+    cache = BoundedCache(3, global_ttl=timedelta(seconds=0.5))
+    cache.add_entry(1, 1)
+    cache.add_entry(2, 2, ttl=timedelta(seconds=5))
+    assert 1 in cache
+
+    await asyncio.sleep(0.75)
+    assert 1 not in cache
+    assert 2 in cache
+
+    cache.add_entry(3, 3)
+    cache.force_clean()
+    assert set(cache.cache) == {2, 3}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("policy", [EvictionPolicy.LRU, EvictionPolicy.LFU])
+async def test_expired_entries_are_evicted_first(policy):
+    cache = BoundedCache(3, policy=policy)
+    cache.add_entry(1, 1)
+    cache.add_entry(2, 2, ttl=timedelta(seconds=0.1))
+    cache.add_entry(3, 3)
+
+    await asyncio.sleep(0.2)
+    # 1 is the least recently and frequently used live entry
+    cache.add_entry(4, 4)
+    assert set(cache.cache) == {1, 3, 4}
+    assert len(cache) == 3
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from bot_base import EventCancelled
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_result(create_bot):
+    bot = create_bot
+    waiter = bot.cancellable_wait_for("custom", check=lambda value: value == 2)
+    task = asyncio.create_task(waiter.wait())
+    await asyncio.sleep(0)
+
+    bot.dispatch("custom", 1)
+    bot.dispatch("custom", 2)
+    assert await task == 2
+    assert waiter.result == 2
+
+
+@pytest.mark.asyncio
+async def test_cancel(create_bot):
+    bot = create_bot
+    waiter = bot.cancellable_wait_for("custom")
+    task = asyncio.create_task(waiter.wait())
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    with pytest.raises(EventCancelled):
+        await task
+
+    # Cancelled listeners are dropped on the next dispatch
+    bot.dispatch("custom", 1)
+    assert "custom" not in bot._listeners
+
+
+@pytest.mark.asyncio
+async def test_timeout(create_bot):
+    bot = create_bot
+    waiter = bot.cancellable_wait_for("custom", timeout=0.01)
+    with pytest.raises(asyncio.TimeoutError):
+        await waiter.wait()
+
+
+@pytest.mark.asyncio
+async def test_task_cancellation_is_not_event_cancellation(create_bot):
+    bot = create_bot
+    task = asyncio.create_task(bot.cancellable_wait_for("custom").wait())
+    await asyncio.sleep(0)
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_single_wait_and_copy(create_bot):
+    bot = create_bot
+    waiter = bot.cancellable_wait_for("custom")
+    task = asyncio.create_task(waiter.wait())
+    await asyncio.sleep(0)
+
+    with pytest.raises(RuntimeError):
+        await waiter.wait()
+
+    copy = waiter.copy()
+    copy_task = asyncio.create_task(copy.wait())
+    await asyncio.sleep(0)
+    bot.dispatch("custom", 1)
+    assert await task == await copy_task == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatch_after_timeout_and_cancel(create_bot):
+    bot = create_bot
+    with pytest.raises(asyncio.TimeoutError):
+        await bot.cancellable_wait_for("custom", timeout=0.01).wait()
+
+    assert "custom" not in bot._listeners
+    bot.dispatch("custom", 1)
+    bot.dispatch("custom", 2)
+
+    waiter = bot.cancellable_wait_for("custom")
+    task = asyncio.create_task(waiter.wait())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    assert "custom" not in bot._listeners
+    bot.dispatch("custom", 3)
+    with pytest.raises(EventCancelled):
+        await task
+
+    assert "custom" not in bot._listeners
+    bot.dispatch("custom", 4)
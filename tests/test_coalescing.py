@@ -0,0 +1,85 @@
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.coalescing import CoalesceMode
+
+
+def listen_for_batches(bot: BotBase) -> BotBase:
+    bot.batches: List[list] = []
+
+    async def on_typing_batch(events):
+        bot.batches.append(events)
+
+    bot.add_listener(on_typing_batch)
+    return bot
+
+
+@pytest.mark.asyncio
+async def test_coalesce_all(create_bot):
+    bot = listen_for_batches(create_bot)
+    bot.coalesce_event("typing", window=0.01)
+
+    for i in range(100):
+        bot.dispatch("typing", i)
+
+    await asyncio.sleep(0.05)
+    assert bot.batches == [[(i,) for i in range(100)]]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_latest(create_bot):
+    bot = listen_for_batches(create_bot)
+    bot.coalesce_event("typing", window=0.01, mode=CoalesceMode.LATEST)
+
+    first, second = SimpleNamespace(id=1), SimpleNamespace(id=2)
+    bot.dispatch("typing", first, 1)
+    bot.dispatch("typing", second, 1)
+    bot.dispatch("typing", first, 2)
+
+    await asyncio.sleep(0.05)
+    assert bot.batches == [[(second, 1), (first, 2)]]
+
+
+@pytest.mark.asyncio
+async def test_stop_coalescing_flushes(create_bot):
+    bot = listen_for_batches(create_bot)
+    bot.coalesce_event("typing", window=60)
+    assert "typing" in bot._dispatch_table
+    bot.dispatch("typing", 1)
+
+    bot.stop_coalescing("typing")
+    await asyncio.sleep(0)
+    assert bot.batches == [[(1,)]]
+    assert not bot._coalescers
+    assert "typing" not in bot._dispatch_table
+
+
+@pytest.mark.asyncio
+async def test_batches_are_wrapped_and_kwargs_are_not_coalesced(create_bot):
+    bot = listen_for_batches(create_bot)
+    bot.scheduled: List[tuple] = []
+    original = bot._schedule_event
+
+    def schedule_event(coro, method, *args, **kwargs):
+        bot.scheduled.append((method, args, kwargs))
+        return original(coro, method, *args, **kwargs)
+
+    bot._schedule_event = schedule_event
+
+    @bot.event
+    async def on_typing(*args, **kwargs):
+        pass
+
+    bot.add_event_wrapper("typing", lambda value: value * 2)
+    bot.coalesce_event("typing", window=0.01)
+
+    bot.dispatch("typing", 1)
+    bot.dispatch("typing", 2, extra=True)
+    assert bot.scheduled == [("on_typing", (4,), {"extra": True})]
+
+    await asyncio.sleep(0.05)
+    assert bot.batches == [[(2,)]]
@@ -0,0 +1,152 @@
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.stats import CommandStatistics
+from tests.fake_mongo import FakeCollection
+
+
+@pytest.fixture
+def create_command_stats() -> CommandStatistics:
+    collection = FakeCollection()
+    return CommandStatistics(
+        SimpleNamespace(raw_collection=collection),  # type: ignore
+        flush_interval=60,
+        max_pending=5,
+    )
+
+
+@pytest.mark.asyncio
+async def test_flush(create_command_stats):
+    create_command_stats.record_usage("ping")
+    create_command_stats.record_usage("ping")
+    create_command_stats.record_failure("echo")
+
+    await create_command_stats.flush()
+    writes = create_command_stats.document.raw_collection.writes
+    assert len(writes) == 1
+
+    updates = {op._filter["_id"]: op._doc["$inc"] for op in writes[0]}
+    assert updates == {
+        "ping": {"usage_count": 2, "failure_count": 0},
+        "echo": {"usage_count": 0, "failure_count": 1},
+    }
+    assert all(op._upsert for op in writes[0])
+    documents = create_command_stats.document.raw_collection.documents
+    assert documents["ping"]["usage_count"] == 2
+
+    # Nothing to write
+    await create_command_stats.flush()
+    assert len(writes) == 1
+
+    await create_command_stats.close()
+
+
+@pytest.mark.asyncio
+async def test_flushes_at_max_pending(create_command_stats):
+    for _ in range(5):
+        create_command_stats.record_usage("ping")
+
+    await asyncio.sleep(0)
+    assert len(create_command_stats.document.raw_collection.writes) == 1
+    await create_command_stats.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried(create_command_stats):
+    collection = create_command_stats.document.raw_collection
+    collection.fail = True
+
+    create_command_stats.record_usage("ping")
+    await create_command_stats.flush()
+    assert not collection.writes
+
+    collection.fail = False
+    create_command_stats.record_usage("ping")
+    await create_command_stats.close()
+
+    assert len(collection.writes) == 1
+    assert collection.writes[0][0]._doc["$inc"]["usage_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_latency(create_command_stats):
+    create_command_stats.record_usage("ping", duration=0.003)
+    create_command_stats.record_failure("ping", duration=0.2)
+    create_command_stats.record_usage("echo")
+
+    assert create_command_stats.get_latency("ping").count == 2
+    assert create_command_stats.get_latency("echo").count == 0
+    assert create_command_stats.slowest_commands() == ["ping"]
+
+    await create_command_stats.flush()
+    operations = {
+        op._filter["_id"]: op._doc
+        for op in create_command_stats.document.raw_collection.writes[0]
+    }
+    assert operations["ping"]["$inc"]["latency.count"] == 2
+    assert operations["ping"]["$inc"]["latency.buckets.5"] == 1
+    assert operations["ping"]["$inc"]["latency.buckets.250"] == 1
+    assert operations["ping"]["$max"] == {"latency.max_ms": pytest.approx(200)}
+    assert "$max" not in operations["echo"]
+
+    await create_command_stats.close()
+
+
+@pytest.mark.asyncio
+async def test_rollups():
+    rollups = FakeCollection()
+    command_stats = CommandStatistics(
+        SimpleNamespace(raw_collection=FakeCollection()),  # type: ignore
+        rollup_document=SimpleNamespace(raw_collection=rollups),  # type: ignore
+        hourly_retention=timedelta(days=1),
+    )
+    command_stats.record_usage("ping")
+    command_stats.record_usage("ping")
+    command_stats.record_failure("ping")
+    await command_stats.close()
+
+    assert rollups.indexes == [
+        (("expires_at",), {"expireAfterSeconds": 0}),
+        (([("period", 1), ("command", 1), ("start", 1)],), {}),
+    ]
+    operations = {
+        op._doc["$setOnInsert"]["period"]: op._doc for op in rollups.writes[0]
+    }
+    assert set(operations) == {"hour", "day"}
+
+    hourly = operations["hour"]
+    assert hourly["$inc"] == {"usage_count": 2, "failure_count": 1}
+    assert hourly["$setOnInsert"]["start"].minute == 0
+    assert hourly["$setOnInsert"]["expires_at"] == hourly["$setOnInsert"][
+        "start"
+    ] + timedelta(days=1)
+
+    daily = operations["day"]
+    assert daily["$inc"] == {"usage_count": 2, "failure_count": 1}
+    assert daily["$setOnInsert"]["start"].hour == 0
+
+
+@pytest.mark.asyncio
+async def test_injected_into_bot():
+    command_stats = CommandStatistics(
+        SimpleNamespace(raw_collection=FakeCollection()),  # type: ignore
+        flush_interval=5,
+        daily_retention=timedelta(days=30),
+    )
+    bot = BotBase(command_prefix="!", leave_db=True, command_stats=command_stats)
+    assert bot.command_stats is command_stats
+    await bot.close()
+
+
+def test_created_outside_event_loop():
+    command_stats = CommandStatistics(
+        SimpleNamespace(raw_collection=FakeCollection())  # type: ignore
+    )
+    assert command_stats._flush_lock is None
+
+    asyncio.run(command_stats.flush())
+    assert command_stats._flush_lock is not None
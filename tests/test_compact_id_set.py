@@ -0,0 +1,48 @@
+from bot_base.blacklist import CompactIdSet
+
+
+def test_contains():
+    ids = CompactIdSet([5, 1, 3, 3])
+    assert len(ids) == 3
+    assert list(ids) == [1, 3, 5]
+
+    assert 3 in ids
+    assert 2 not in ids
+    assert 6 not in ids
+    assert "3" not in ids
+    assert -1 not in ids
+
+
+def test_add_and_discard():
+    ids = CompactIdSet()
+    assert not ids
+
+    ids.add(10)
+    ids.add(2)
+    ids.add(10)
+    assert list(ids) == [2, 10]
+
+    ids.discard(10)
+    ids.discard(11)
+    assert list(ids) == [2]
+
+
+def test_update():
+    ids = CompactIdSet([2, 4, 6])
+    ids.update([1, 4, 7, 5])
+    assert list(ids) == [1, 2, 4, 5, 6, 7]
+
+    ids.difference_update([1, 7, 8])
+    assert list(ids) == [2, 4, 5, 6]
+
+
+def test_large_ids():
+    discord_id = 1_012_345_678_901_234_567
+    ids = CompactIdSet([discord_id])
+    assert discord_id in ids
+
+
+def test_eq():
+    assert CompactIdSet([1, 2]) == {1, 2}
+    assert CompactIdSet([1, 2]) != {1, 3}
+    assert CompactIdSet([1, 2]) == CompactIdSet([2, 1])
@@ -0,0 +1,106 @@
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from bot_base import BotBase
+
+
+def capture_scheduled(bot: BotBase) -> BotBase:
+    bot.scheduled: List[tuple] = []
+    bot._schedule_event = lambda coro, method, *args, **kwargs: bot.scheduled.append(
+        (method, args)
+    )
+    return bot
+
+
+def create_message(message_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=message_id, channel=SimpleNamespace(id=1), author=SimpleNamespace(id=2)
+    )
+
+
+@pytest.mark.asyncio
+async def test_unhandled_events_are_dropped(create_bot):
+    bot = capture_scheduled(create_bot)
+    wrapped = []
+    bot.add_event_wrapper(
+        "message_edit", lambda *args: wrapped.append(args) or args, arguments=2
+    )
+
+    assert "message_edit" not in bot._dispatch_table
+    bot.dispatch("message_edit", create_message(1), create_message(2))
+    assert wrapped == []
+    assert bot.scheduled == []
+
+
+@pytest.mark.asyncio
+async def test_table_follows_listeners(create_bot):
+    bot = capture_scheduled(create_bot)
+
+    async def on_message_edit(before, after):
+        pass
+
+    bot.add_listener(on_message_edit)
+    assert "message_edit" in bot._dispatch_table
+
+    before, after = create_message(1), create_message(2)
+    channel = before.channel
+    bot.dispatch("message_edit", before, after)
+    assert len(bot.scheduled) == 1
+    method, args = bot.scheduled[0]
+    assert method == "on_message_edit"
+    assert args == (before, after, bot)
+    assert args[0].channel._wrapped_item is channel
+
+    bot.remove_listener(on_message_edit)
+    assert "message_edit" not in bot._dispatch_table
+
+
+@pytest.mark.asyncio
+async def test_waiters_receive_unhandled_events(create_bot):
+    bot = capture_scheduled(create_bot)
+    waiter = bot.loop.create_future()
+    bot._listeners["custom"] = [(waiter, lambda value: True)]
+
+    bot.dispatch("custom", 1)
+    assert waiter.result() == 1
+
+
+@pytest.mark.asyncio
+async def test_custom_event_wrappers(create_bot):
+    bot = capture_scheduled(create_bot)
+
+    @bot.event
+    async def on_typing(value):
+        pass
+
+    bot.add_event_wrapper("typing", lambda value: value * 2)
+    bot.dispatch("typing", 2)
+    assert bot.scheduled == [("on_typing", (4,))]
+
+    bot.remove_event_wrapper("typing")
+    bot.dispatch("typing", 2)
+    assert bot.scheduled[-1] == ("on_typing", (2,))
+
+    with pytest.raises(ValueError):
+        bot.add_event_wrapper("typing", lambda value: value, arguments=3)
+
+
+@pytest.mark.asyncio
+async def test_handlers_added_directly_are_dispatched(create_bot):
+    bot = capture_scheduled(create_bot)
+
+    async def on_custom(value):
+        pass
+
+    bot.on_custom = on_custom
+    bot.dispatch("custom", 1)
+    assert bot.scheduled == [("on_custom", (1,))]
+
+    async def listener(value):
+        pass
+
+    bot.extra_events["on_other"] = [listener]
+    bot.dispatch("other", 2)
+    assert "other" in bot._dispatch_table
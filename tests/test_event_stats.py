@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.stats import EventStatistics
+
+
+@pytest.mark.asyncio
+async def test_listener_busy_time():
+    stats = EventStatistics(sample_rate=1)
+
+    async def listener(value):
+        time.sleep(0.02)
+        await asyncio.sleep(0.05)
+        return value
+
+    assert await stats.time_listener(listener, "on_test")(1) == 1
+
+    listener_stats = stats.listeners[("on_test", listener.__qualname__)]
+    assert listener_stats.calls == 1
+    # Only the blocking sleep holds the event loop
+    assert 20 <= listener_stats.busy_ms < 50
+    assert listener_stats.latency.max_ms >= 70
+
+
+@pytest.mark.asyncio
+async def test_listener_errors_are_recorded():
+    stats = EventStatistics(sample_rate=1)
+
+    async def listener():
+        await asyncio.sleep(0)
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        await stats.time_listener(listener, "on_test")()
+
+    assert stats.slowest_listeners()[0][1].calls == 1
+
+
+def test_sample_rate():
+    assert not EventStatistics(sample_rate=0).should_sample()
+    assert EventStatistics(sample_rate=1).should_sample()
+
+    with pytest.raises(ValueError):
+        EventStatistics(sample_rate=2)
+
+
+@pytest.mark.asyncio
+async def test_bot_records_events():
+    bot = BotBase(command_prefix="!", leave_db=True, event_stats_sample_rate=1)
+
+    async def on_custom(value):
+        pass
+
+    bot.add_listener(on_custom)
+    bot.dispatch("custom", 1)
+    bot.dispatch("unhandled")
+    await asyncio.sleep(0)
+
+    assert bot.event_stats.events == {"custom": 1, "unhandled": 1}
+    (event, _), listener_stats = bot.event_stats.slowest_listeners()[0]
+    assert event == "on_custom"
+    assert listener_stats.calls == 1
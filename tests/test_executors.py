@@ -0,0 +1,131 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.executors import InstrumentedThreadPool, ProcessOffloader
+
+
+def get_pid(offset: int = 0) -> int:
+    return os.getpid() + offset
+
+
+def slow(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+def crash() -> None:
+    os._exit(1)
+
+
+@pytest.mark.asyncio
+async def test_runs_in_process():
+    offloader = ProcessOffloader(max_workers=1)
+    try:
+        assert await offloader.run(get_pid) != os.getpid()
+        assert await offloader.run(get_pid, offset=0) != os.getpid()
+    finally:
+        offloader.close()
+
+
+@pytest.mark.asyncio
+async def test_unpicklable_falls_back_to_thread():
+    offloader = ProcessOffloader(max_workers=1)
+    lock = threading.Lock()
+    try:
+        # Local functions, and locks, can't be pickled
+        result = await offloader.run(lambda value: (os.getpid(), value), lock)
+        assert result == (os.getpid(), lock)
+        assert offloader._process_pool is None
+    finally:
+        offloader.close()
+
+
+@pytest.mark.asyncio
+async def test_timeout_keeps_capacity_until_done():
+    offloader = ProcessOffloader(max_workers=1, max_concurrency=1)
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await offloader.run(slow, 0.3, timeout=0.01)
+
+        # The first call is still running so this has to wait for it
+        start = time.perf_counter()
+        await offloader.run(slow, 0)
+        assert time.perf_counter() - start > 0.1
+    finally:
+        offloader.close()
+
+
+@pytest.mark.asyncio
+async def test_closed():
+    offloader = ProcessOffloader()
+    offloader.close()
+    with pytest.raises(RuntimeError):
+        await offloader.run(get_pid)
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_replaced():
+    offloader = ProcessOffloader(max_workers=1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            await offloader.run(crash)
+
+        broken = offloader._process_pool
+        assert await offloader.run(get_pid) != os.getpid()
+        assert offloader._process_pool is not broken
+    finally:
+        offloader.close()
+
+
+def test_start_method():
+    assert ProcessOffloader().mp_context.get_start_method() == "spawn"
+
+    context = multiprocessing.get_context("forkserver")
+    assert ProcessOffloader(mp_context=context).mp_context is context
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_statistics():
+    pool = InstrumentedThreadPool("test", 1)
+    first = asyncio.ensure_future(pool.run(slow, 0.05))
+    second = asyncio.ensure_future(pool.run(slow, 0))
+    await asyncio.sleep(0.01)
+    assert pool.active == 1
+    assert pool.queued == 1
+    assert pool.utilization == 1
+    assert pool.saturated == 1
+
+    await asyncio.gather(first, second)
+    assert pool.active == pool.queued == 0
+    assert pool.run_time.count == 2
+    assert pool.run_time.max_ms >= 50
+    # The second call waited for the first to finish
+    assert pool.queue_wait.max_ms >= 30
+
+    await pool.close()
+    with pytest.raises(RuntimeError):
+        await pool.run(slow, 0)
+
+
+@pytest.mark.asyncio
+async def test_run_blocking():
+    bot = BotBase(command_prefix="!", leave_db=True, thread_pools={"io": 2})
+    try:
+        assert await bot.run_blocking(threading.get_ident) != threading.get_ident()
+        assert bot.thread_pools["io"].run_time.count == 1
+
+        with pytest.raises(ValueError):
+            await bot.run_blocking(slow, 0, pool="missing")
+
+        with pytest.raises(ValueError):
+            bot.add_thread_pool("io", 1)
+    finally:
+        await bot.close()
+
+    assert bot.thread_pools["io"]._executor is None
@@ -0,0 +1,97 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.exceptions import PrefixNotFound
+from tests.fake_mongo import fake_document
+
+
+def create_prefix_bot(**kwargs) -> BotBase:
+    bot = BotBase(command_prefix="!", leave_db=True, **kwargs)
+    bot.db = SimpleNamespace(config=fake_document())
+    bot._connection._guilds = {
+        guild_id: SimpleNamespace(id=guild_id) for guild_id in (1, 2, 3)
+    }
+    return bot
+
+
+@pytest.mark.asyncio
+async def test_load_prefix_cache():
+    bot = create_prefix_bot()
+    documents = bot.db.config.raw_collection.documents
+    documents[1] = {"_id": 1, "prefix": "?"}
+    documents[2] = {"_id": 2, "prefix": ["t.", "$"]}
+    documents[4] = {"_id": 4, "prefix": "not ours"}
+
+    assert await bot.load_prefix_cache() == 2
+    assert bot.prefix_cache.get_entry(1) == "?"
+    assert bot.prefix_cache.get_entry(2) == ["t.", "$"]
+    assert 4 not in bot.prefix_cache
+
+    assert 3 not in bot.prefix_cache
+    assert 3 in bot.prefix_not_found_cache
+    assert 1 not in bot.prefix_not_found_cache
+
+
+@pytest.mark.asyncio
+async def test_prefix_cache_warm_up_is_retried():
+    bot = create_prefix_bot(load_prefix_cache_on_ready=True)
+    collection = bot.db.config.raw_collection
+    collection.documents[1] = {"_id": 1, "prefix": "?"}
+    find = collection.find
+
+    def failing_find(*args, **kwargs):
+        raise ConnectionError
+
+    collection.find = failing_find
+    with pytest.raises(ConnectionError):
+        await bot.on_ready()
+
+    collection.find = find
+    await bot.on_ready()
+    assert bot.prefix_cache.get_entry(1) == "?"
+
+    # Only ever warmed up once it succeeds
+    bot.prefix_cache.delete_entry(1)
+    await bot.on_ready()
+    assert 1 not in bot.prefix_cache
+
+
+@pytest.mark.asyncio
+async def test_missing_prefixes_are_cached():
+    bot = create_prefix_bot()
+    collection = bot.db.config.raw_collection
+    finds = []
+
+    async def find(query):
+        finds.append(query)
+        return collection.documents.get(query["_id"])
+
+    async def upsert(query, update):
+        await collection.update_one(query, {"$set": update}, upsert=True)
+
+    bot.db.config.find = find
+    bot.db.config.upsert = upsert
+
+    with pytest.raises(PrefixNotFound):
+        await bot.get_guild_prefix(1)
+
+    assert 1 in bot.prefix_not_found_cache
+    assert len(finds) == 1
+
+    # Answered from the negative cache without touching the database
+    with pytest.raises(PrefixNotFound):
+        await bot.get_guild_prefix(1)
+
+    assert len(finds) == 1
+
+    await bot.set_guild_prefix(1, "?")
+    assert 1 not in bot.prefix_not_found_cache
+    assert await bot.get_guild_prefix(1) == "?"
+    assert len(finds) == 1
+
+    bot.invalidate_guild_prefix(1)
+    assert 1 not in bot.prefix_cache
+    assert await bot.get_guild_prefix(1) == "?"
+    assert len(finds) == 2
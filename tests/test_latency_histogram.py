@@ -0,0 +1,64 @@
+from bot_base.stats import LatencyHistogram
+
+
+def test_empty():
+    histogram = LatencyHistogram()
+    assert histogram.p50 == 0
+    assert histogram.mean == 0
+
+
+def test_percentiles():
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.record(3)
+    for _ in range(9):
+        histogram.record(80)
+    histogram.record(70000)
+
+    assert histogram.count == 100
+    assert histogram.p50 == 5
+    assert histogram.p95 == 100
+    assert histogram.p99 == 100
+    assert histogram.percentile(1) == 70000
+    assert histogram.max_ms == 70000
+
+
+def test_percentile_capped_at_max():
+    histogram = LatencyHistogram()
+    histogram.record(30)
+    assert histogram.p99 == 30
+
+
+def test_round_trip():
+    histogram = LatencyHistogram()
+    histogram.record(1)
+    histogram.record(300)
+    histogram.record(100000)
+
+    update = histogram.as_update()
+    document = {
+        "buckets": {
+            k.split(".")[-1]: v
+            for k, v in update["$inc"].items()
+            if k.startswith("latency.buckets.")
+        },
+        "count": update["$inc"]["latency.count"],
+        "total_ms": update["$inc"]["latency.total_ms"],
+        "max_ms": update["$max"]["latency.max_ms"],
+    }
+    rebuilt = LatencyHistogram.from_document(document)
+    assert rebuilt.buckets == histogram.buckets
+    assert rebuilt.count == 3
+    assert rebuilt.max_ms == 100000
+
+
+def test_merge():
+    first = LatencyHistogram()
+    first.record(10)
+    second = LatencyHistogram()
+    second.record(1000)
+
+    first.merge(second)
+    assert first.count == 2
+    assert first.max_ms == 1000
+    assert first.total_ms == 1010
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.prefixes import PrefixMatcher
+
+
+def test_requires_a_prefix():
+    with pytest.raises(ValueError):
+        PrefixMatcher([])
+
+    with pytest.raises(ValueError):
+        PrefixMatcher("")
+
+
+def test_single_prefix():
+    matcher = PrefixMatcher("t.")
+    assert matcher.prefixes == ("t.",)
+
+    assert matcher.match("t.ping") == "t."
+    assert matcher.match("T.ping") == "T."
+    assert matcher.match("ping") is None
+    assert matcher.match("t") is None
+    assert matcher.match("") is None
+
+
+def test_multiple_prefixes():
+    matcher = PrefixMatcher(["!", "!!", "bot ", "!"])
+    assert matcher.prefixes == ("!", "!!", "bot ")
+
+    # Longest prefix wins
+    assert matcher.match("!!ping") == "!!"
+    assert matcher.match("!ping") == "!"
+    assert matcher.match("BoT ping") == "BoT "
+    assert matcher.match("bo") is None
+
+
+def test_casefold_expansion():
+    matcher = PrefixMatcher("ss")
+    assert matcher.match("ßping") == "ß"
+    assert "ßping".startswith(matcher.match("ßping"))
+
+    assert PrefixMatcher("s").match("ßping") is None
+
+
+def test_could_match():
+    matcher = PrefixMatcher(["t.", "?"])
+    assert matcher.could_match("T.ping")
+    assert matcher.could_match("?ping")
+    assert matcher.could_match("too")
+    assert not matcher.could_match("hello")
+    assert not matcher.could_match("")
+
+
+@pytest.mark.asyncio
+async def test_prefix_cache_holds_prefixes():
+    bot = BotBase(command_prefix="!", leave_db=True)
+
+    async def upsert(*_):
+        pass
+
+    bot.db = SimpleNamespace(config=SimpleNamespace(upsert=upsert))
+    await bot.set_guild_prefix(1, ["t.", "?"])
+    assert bot.prefix_cache.get_entry(1) == ["t.", "?"]
+
+    matcher = await bot.get_guild_prefix_matcher(1)
+    assert matcher.prefixes == ("t.", "?")
+    assert await bot.get_guild_prefix_matcher(1) is matcher
+
+    bot.prefix_cache.add_entry(1, "$", override=True)
+    assert (await bot.get_guild_prefix_matcher(1)).prefixes == ("$",)
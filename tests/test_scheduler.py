@@ -0,0 +1,102 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from bot_base.scheduler import CommandScheduler, OverflowPolicy
+
+
+def record(order: List, value, event: asyncio.Event = None):
+    async def work():
+        order.append(value)
+        if event is not None:
+            await event.wait()
+
+    return work
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    scheduler = CommandScheduler(max_concurrency=2)
+    release = asyncio.Event()
+    order = []
+    for i in range(5):
+        assert await scheduler.submit(1, record(order, i, release))
+
+    await asyncio.sleep(0)
+    assert scheduler.running == 2
+    assert scheduler.queued == 3
+    assert scheduler.queue_depths() == {1: 3}
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert order == [0, 1, 2, 3, 4]
+    assert scheduler.running == 0
+    assert scheduler.queue_depths() == {}
+
+
+@pytest.mark.asyncio
+async def test_round_robin():
+    scheduler = CommandScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    order = []
+    await scheduler.submit("blocker", record(order, "blocker", release))
+    for i in range(3):
+        await scheduler.submit("raid", record(order, f"raid {i}"))
+
+    await scheduler.submit("quiet", record(order, "quiet"))
+    assert scheduler.deepest_queues(1) == [("raid", 3)]
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert order == ["blocker", "raid 0", "quiet", "raid 1", "raid 2"]
+
+
+@pytest.mark.asyncio
+async def test_priority_lane():
+    scheduler = CommandScheduler(max_concurrency=1, max_queue_size=1)
+    release = asyncio.Event()
+    order = []
+    await scheduler.submit(1, record(order, "blocker", release))
+    await scheduler.submit(1, record(order, "queued"))
+    assert await scheduler.submit(1, record(order, "owner"), priority=True)
+    assert scheduler.priority_queued == 1
+
+    release.set()
+    await asyncio.sleep(0.01)
+    assert order == ["blocker", "owner", "queued"]
+
+
+@pytest.mark.asyncio
+async def test_drop_when_full():
+    scheduler = CommandScheduler(max_concurrency=1, max_queue_size=1)
+    release = asyncio.Event()
+    await scheduler.submit(1, record([], 0, release))
+    assert await scheduler.submit(1, record([], 1))
+    assert not await scheduler.submit(1, record([], 2))
+    # Other keys still have space
+    assert await scheduler.submit(2, record([], 3))
+    assert scheduler.dropped == {1: 1}
+
+    await scheduler.close()
+    assert scheduler.running == 0
+
+
+@pytest.mark.asyncio
+async def test_defer_when_full():
+    scheduler = CommandScheduler(
+        max_concurrency=1, max_queue_size=1, overflow_policy=OverflowPolicy.DEFER
+    )
+    release = asyncio.Event()
+    order = []
+    await scheduler.submit(1, record(order, 0, release))
+    await scheduler.submit(1, record(order, 1))
+    deferred = asyncio.create_task(scheduler.submit(1, record(order, 2)))
+
+    await asyncio.sleep(0.01)
+    assert not deferred.done()
+
+    release.set()
+    assert await deferred
+    await asyncio.sleep(0.01)
+    assert order == [0, 1, 2]
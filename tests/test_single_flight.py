@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.caches import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_load(create_timed_cache):
+    loads = SingleFlight()
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.1)
+        return "value"
+
+    def on_loaded(value):
+        create_timed_cache.add_entry("key", value, override=True)
+
+    results = await asyncio.gather(
+        *(loads.load("key", loader, on_loaded=on_loaded) for _ in range(10))
+    )
+    assert results == ["value"] * 10
+    assert calls == 1
+    assert create_timed_cache.get_entry("key") == "value"
+    assert "key" not in loads
+
+
+@pytest.mark.asyncio
+async def test_load_error():
+    loads = SingleFlight()
+
+    async def loader():
+        await asyncio.sleep(0.1)
+        raise ValueError
+
+    results = await asyncio.gather(
+        *(loads.load("key", loader) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert all(isinstance(r, ValueError) for r in results)
+    assert "key" not in loads
+
+
+@pytest.mark.asyncio
+async def test_invalidate_skips_on_loaded():
+    loads = SingleFlight()
+    loaded = []
+
+    async def loader():
+        await asyncio.sleep(0.1)
+        return "stale"
+
+    task = asyncio.ensure_future(loads.load("key", loader, on_loaded=loaded.append))
+    await asyncio.sleep(0)
+    loads.invalidate("key")
+    assert "key" not in loads
+
+    assert await task == "stale"
+    assert loaded == []
+
+
+@pytest.mark.asyncio
+async def test_prefix_changed_while_loading():
+    bot = BotBase(command_prefix="!", leave_db=True)
+    release = asyncio.Event()
+
+    async def find(_):
+        await release.wait()
+        return None
+
+    async def upsert(*_):
+        pass
+
+    bot.db = SimpleNamespace(config=SimpleNamespace(find=find, upsert=upsert))
+    lookup = asyncio.ensure_future(bot.get_guild_prefix_matcher(1))
+    await asyncio.sleep(0)
+
+    await bot.set_guild_prefix(1, "?")
+    release.set()
+    await asyncio.gather(lookup, return_exceptions=True)
+
+    assert 1 not in bot.prefix_not_found_cache
+    assert (await bot.get_guild_prefix_matcher(1)).prefixes == ("?",)
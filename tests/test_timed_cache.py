@@ -86,3 +86,35 @@ async def test_non_lazy(create_timed_cache):
     assert 1 in create_timed_cache.cache
     create_timed_cache.add_entry(2, 2)
     assert 1 not in create_timed_cache.cache
+
+
+@pytest.mark.asyncio
+async def test_override_keeps_new_expiry(create_timed_cache):
+    create_timed_cache.add_entry("key", "value", ttl=timedelta(seconds=0.5))
+    create_timed_cache.add_entry(
+        "key", "value 2", ttl=timedelta(seconds=5), override=True
+    )
+
+    await asyncio.sleep(0.75)
+    create_timed_cache.force_clean()
+    assert create_timed_cache.get_entry("key") == "value 2"
+
+
+def test_len_only_counts_live_entries(create_timed_cache):
+    create_timed_cache.add_entry(1, 1, ttl=timedelta(seconds=-1))
+    create_timed_cache.add_entry(2, 2)
+    create_timed_cache.add_entry(3, 3, ttl=timedelta(seconds=60))
+
+    assert len(create_timed_cache) == 2
+    assert 1 not in create_timed_cache.cache
+
+
+def test_expiry_heap_is_compacted(create_timed_cache):
+    for _ in range(500):
+        create_timed_cache.add_entry(
+            "key", "value", ttl=timedelta(seconds=60), override=True
+        )
+
+    assert (
+        len(create_timed_cache._expiry_heap) <= 2 * len(create_timed_cache.cache) + 64
+    )
@@ -0,0 +1,125 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot_base import BotBase
+from bot_base.wraps import (
+    LazyWrappedMessage,
+    Meta,
+    WrappedChannel,
+    WrappedMember,
+    WrappedUser,
+)
+
+
+@pytest.mark.asyncio
+async def test_wrapping_is_idempotent(create_bot):
+    bot = create_bot
+    message = SimpleNamespace(
+        channel=SimpleNamespace(id=1), author=SimpleNamespace(id=2)
+    )
+    wrapped = bot.get_wrapped_message(message)
+    channel, author = wrapped.channel, wrapped.author
+
+    assert isinstance(channel, WrappedChannel)
+    assert isinstance(author, WrappedUser)
+
+    bot.get_wrapped_message(wrapped)
+    assert wrapped.channel is channel
+    assert wrapped.author is author
+    assert bot.get_wrapped_channel(channel) is channel
+
+
+@pytest.mark.asyncio
+async def test_wrappers_are_reused(create_bot):
+    bot = create_bot
+    channel = SimpleNamespace(id=1)
+    first = bot.get_wrapped_channel(channel)
+    assert bot.get_wrapped_channel(channel) is first
+    assert first._wrapped_item is channel
+
+    other = bot.get_wrapped_channel(SimpleNamespace(id=1))
+    assert other is not first
+
+
+def test_attributes_are_forwarded():
+    item = SimpleNamespace(id=1, guild=None, topic="topic")
+    wrapped = WrappedChannel(item, None)
+
+    assert isinstance(vars(WrappedChannel)["id"], property)
+    assert wrapped.id == 1
+    assert wrapped.guild is None
+    # Not known to the wrapped class, falls back to __getattr__
+    assert wrapped.topic == "topic"
+
+    # Writes aren't forwarded unless asked for
+    with pytest.raises(AttributeError):
+        wrapped.id = 2
+
+    assert item.id == 1
+
+
+class Library:
+    id: int
+
+    @classmethod
+    def from_data(cls, data):
+        return cls()
+
+    @staticmethod
+    def helper():
+        pass
+
+    def _private(self):
+        pass
+
+    def public(self):
+        return self.id
+
+
+class WritableWrapper(Meta, Library, forward_attributes=True, forward_writes=True):
+    pass
+
+
+def test_forwarded_attributes():
+    for name in ("from_data", "helper", "_private"):
+        assert name not in vars(WritableWrapper)
+
+    assert isinstance(vars(WritableWrapper)["id"], property)
+    assert isinstance(vars(WritableWrapper)["public"], property)
+
+    item = SimpleNamespace(id=1, public=lambda: 1)
+    wrapped = WritableWrapper(item, None)
+    wrapped.id = 2
+    assert item.id == 2
+    assert wrapped.id == 2
+
+
+def test_meta_attributes_are_not_forwarded():
+    assert WrappedMember.prompt is Meta.prompt
+    assert WrappedMember.__eq__ is Meta.__eq__
+
+    # Wrappers are slotted, so they can't gain attributes of their own
+    with pytest.raises(AttributeError):
+        WrappedUser(SimpleNamespace(), None).unknown = True
+
+
+@pytest.mark.asyncio
+async def test_lazy_message_wrapping():
+    bot = BotBase(command_prefix="!", leave_db=True, lazy_message_wrapping=True)
+    message = SimpleNamespace(
+        id=1, content="hi", channel=SimpleNamespace(id=2), author=SimpleNamespace(id=3)
+    )
+    lazy = bot._single_event_type_sheet["on_message"](message)
+
+    assert isinstance(lazy, LazyWrappedMessage)
+    assert lazy.content == "hi"
+    assert lazy._wrapped_channel is None
+    assert lazy._wrapped_author is None
+
+    assert isinstance(lazy.channel, WrappedChannel)
+    assert lazy.channel is lazy.channel
+    assert lazy._wrapped_author is None
+
+    assert bot.get_wrapped_message(lazy) is lazy
+    assert bot.get_lazy_wrapped_message(lazy) is lazy